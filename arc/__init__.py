@@ -1,5 +1,34 @@
 __version__ = "0.1.0"
 
-from arc.app import Arc
+import importlib
+from typing import TYPE_CHECKING, Any
 
-__all__ = ("Arc",)
+if TYPE_CHECKING:
+    from arc.app import Arc
+    from arc.dependencies import Depends
+    from arc.state import State
+
+__all__ = ("Arc", "Depends", "State")
+
+# The public API is imported lazily, so that importing a part of arc doesn't
+# import everything else along with it. For the same reason, heavy optional
+# dependencies, such as pydantic, orjson and uvicorn, are only imported inside
+# the functions which use them, keeping `import arc` fast
+_LAZY_IMPORTS = {
+    "Arc": "arc.app",
+    "Depends": "arc.dependencies",
+    "State": "arc.state",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _LAZY_IMPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(_LAZY_IMPORTS[name]), name)
+    globals()[name] = value  # Cache the attribute, so this is only called once
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted([*globals(), *_LAZY_IMPORTS])
@@ -1,8 +1,8 @@
-from typing import Optional, Sequence, TypeVar, Type
-
-import uvicorn
+import gc
+from typing import Any, AsyncContextManager, Optional, Sequence, TypeVar, Type, Union
 
 from arc.routing import Route, Router
+from arc.state import State
 from arc.types import CoroutineFunction, DCallable, Callable
 
 T = TypeVar("T")
@@ -18,10 +18,18 @@ class Arc:
           use.
         middleware: A sequence of objects that are used as the middleware
           for the ASGI app.
+        on_startup: A sequence of callables which are called when the
+          application starts up.
+        on_shutdown: A sequence of callables which are called when the
+          application shuts down.
+        lifespan: A callable which takes the application and returns an
+          async context manager, which is entered on startup and exited
+          on shutdown.
 
     Attributes:
         router: The router for the ASGI app.
         middleware: The middleware for the ASGI app.
+        state: The application's state, shared across requests.
     """
 
     def __init__(
@@ -29,8 +37,12 @@ class Arc:
         *,
         routes: Optional[Sequence[Route]] = None,
         middleware: Optional[Sequence[tuple[Type[T], dict]]] = None,
+        on_startup: Optional[Sequence[Callable]] = None,
+        on_shutdown: Optional[Sequence[Callable]] = None,
+        lifespan: Optional[Callable[["Arc"], AsyncContextManager[Any]]] = None,
     ):
-        self.router = Router(self, routes)
+        self.state = State()
+        self.router = Router(self, routes, on_startup, on_shutdown, lifespan)
 
         self.middleware = (
             self.router
@@ -38,14 +50,19 @@ class Arc:
 
         if middleware is not None:
             for cls, args in reversed(middleware):
-                self.middleware = cls(**args)
+                self.middleware = cls(self.middleware, **args)
 
     async def __call__(
         self, scope: dict, receive: CoroutineFunction, send: CoroutineFunction
     ):
-        await self.router(scope, receive, send)
+        await self.middleware(scope, receive, send)
 
-    def route(self, path: str, methods: Optional[Sequence[str]]) -> DCallable:
+    def route(
+        self,
+        path: str,
+        methods: Optional[Sequence[str]],
+        early_hints: Optional[Sequence[Union[str, bytes]]] = None,
+    ) -> DCallable:
         """A decorator used for adding new routes to the application's Router.
 
         A wrapper around the application's Router's `register` function that
@@ -54,16 +71,78 @@ class Arc:
         Args:
             path: The path for the route.
             methods: A sequence of HTTP methods that the route should accept.
+            early_hints: The values of `Link` headers which are sent as 103
+              Early Hints before the handler is called, if the server
+              supports them.
 
         Returns:
             A decorated callable function.
         """
 
         def wrapper(handler: Callable):
-            self.router.register(path, handler, methods)
+            self.router.register(path, handler, methods, early_hints)
             return handler
 
         return wrapper
 
+    def on_startup(self, handler: DCallable) -> DCallable:
+        """A decorator used for adding a startup handler to the application.
+
+        Args:
+            handler: A callable which is called when the application
+              starts up.
+
+        Returns:
+            The handler, unchanged.
+        """
+
+        if self.router.frozen:
+            raise AttributeError("Cannot add startup handlers to a frozen application")
+
+        self.router.on_startup.append(handler)
+        return handler
+
+    def on_shutdown(self, handler: DCallable) -> DCallable:
+        """A decorator used for adding a shutdown handler to the application.
+
+        Args:
+            handler: A callable which is called when the application
+              shuts down.
+
+        Returns:
+            The handler, unchanged.
+        """
+
+        if self.router.frozen:
+            raise AttributeError("Cannot add shutdown handlers to a frozen application")
+
+        self.router.on_shutdown.append(handler)
+        return handler
+
+    def freeze(self, gc_freeze: Optional[bool] = False):
+        """Compiles the application's routes into an immutable dispatch table.
+
+        Should be called once every route is registered. Routes, as well as
+        startup and shutdown handlers, can't be added afterwards. When the
+        application is frozen before a server forks its workers, the workers
+        inherit the compiled table instead of building their own.
+
+        Args:
+            gc_freeze: Whether to also move every object tracked by the
+              garbage collector into its permanent generation. This stops
+              collections in forked workers from writing to, and so copying,
+              the memory pages they share with the parent process, but
+              affects the whole process: every object alive at that point,
+              including unreachable cycles, is never collected. Only meant
+              for a server's parent process, right before it forks.
+        """
+
+        self.router.freeze()
+
+        if gc_freeze:
+            gc.freeze()
+
     def run(self):
+        import uvicorn
+
         uvicorn.run(self, host="127.0.0.1", port=5000)
@@ -0,0 +1,384 @@
+import asyncio
+import inspect
+from typing import Any, Callable, Hashable, Optional
+
+from arc.exceptions import BadRequest
+from arc.http.requests import Request
+from arc.state import State
+
+SCOPES = {"request", "app"}
+
+
+class Depends:
+    """Declares a dependency for a route handler or another dependency.
+
+    Used as the default value of a parameter, the parameter then receives the
+    result of calling the dependency. Dependencies can take path and query
+    parameters by name, which are cast to their declared types, the
+    application's state by annotating a parameter with `State`, the request
+    by annotating a parameter with `Request`, and other dependencies.
+
+    Args:
+        dependency: A function, synchronous or asynchronous, whose result is
+          injected.
+        scope: Either `request`, in which case the dependency is called once
+          per request, or `app`, in which case the dependency is called once
+          and its result is reused across requests. App scoped dependencies
+          can only take the application's state and other app scoped
+          dependencies.
+        use_cache: Whether the result of the dependency is shared with other
+          parameters which depend on it during the same request.
+
+    Attributes:
+        dependency: The dependency which is called.
+        scope: The scope of the dependency.
+        use_cache: Whether the result of the dependency is shared.
+    """
+
+    def __init__(
+        self,
+        dependency: Callable,
+        *,
+        scope: Optional[str] = "request",
+        use_cache: Optional[bool] = True,
+    ):
+        if scope not in SCOPES:
+            raise AttributeError(
+                f"Invalid dependency scope {scope}, has to be one of request or app"
+            )
+
+        self.dependency = dependency
+        self.scope = scope
+        self.use_cache = use_cache
+
+    @property
+    def key(self) -> Hashable:
+        """The key under which the result of the dependency is cached."""
+
+        # Uncached dependencies are keyed by their declaration, so they never collide
+        return (self.dependency, self.scope) if self.use_cache else self
+
+    def __repr__(self) -> str:
+        name = getattr(self.dependency, "__name__", repr(self.dependency))
+        return f"Depends({name}, scope={self.scope!r})"
+
+
+class Dependency:
+    """A single compiled node in a dependency graph.
+
+    Args:
+        depends: The `Depends` declaration the node was compiled from.
+        params: The names of the parameters of the dependency which are
+          taken from the path and query parameters of the request, their
+          defaults, and the functions which cast them to their declared
+          types, if any.
+        state_params: The names of the parameters which receive the
+          application's state.
+        request_params: The names of the parameters which receive the
+          request.
+        sub_dependencies: A mapping of parameter names to the nodes
+          whose results they receive.
+
+    Attributes:
+        key: The key under which the result of the node is cached.
+        depth: The length of the longest chain of sub-dependencies below
+          the node, used for ordering the graph.
+    """
+
+    def __init__(
+        self,
+        depends: Depends,
+        params: list[tuple[str, Any, Optional[Callable[[Any], Any]]]],
+        state_params: list[str],
+        request_params: list[str],
+        sub_dependencies: dict[str, "Dependency"],
+    ):
+        self.call = depends.dependency
+        self.scope = depends.scope
+        self.key = depends.key
+        self.is_coroutine = inspect.iscoroutinefunction(depends.dependency)
+        self.params = params
+        self.state_params = state_params
+        self.request_params = request_params
+        self.sub_dependencies = sub_dependencies
+        self.depth: int = (
+            max(sub.depth for sub in sub_dependencies.values()) + 1
+            if sub_dependencies
+            else 0
+        )
+
+    async def __call__(
+        self,
+        state: State,
+        request: Optional[Request],
+        params: dict[str, Any],
+        results: dict[Hashable, Any],
+    ) -> Any:
+        kwargs = {}
+
+        for name, default, coercer in self.params:
+            if name in params:
+                value = params[name]
+                if coercer is not None:
+                    try:
+                        value = coercer(value)
+                    except ValueError as e:  # pydantic's ValidationError
+                        raise BadRequest(
+                            f"Bad request, failed to parse parameters: {e.errors()[0]['msg']}"
+                        ) from None
+                kwargs[name] = value
+            elif default is not inspect.Parameter.empty:
+                kwargs[name] = default
+
+        for name in self.state_params:
+            kwargs[name] = state
+
+        for name in self.request_params:
+            kwargs[name] = request
+
+        for name, sub in self.sub_dependencies.items():
+            kwargs[name] = results[sub.key]
+
+        if self.is_coroutine:
+            return await self.call(**kwargs)
+
+        return self.call(**kwargs)
+
+
+class DependencyGraph:
+    """The compiled dependencies of a route handler.
+
+    Built once when a route is created. The nodes of the graph are grouped
+    into levels in topological order, so that every node only depends on
+    nodes from earlier levels, and the nodes within a level are resolved
+    concurrently.
+
+    Args:
+        handler_dependencies: A mapping of the handler's parameter names to
+          the nodes whose results they receive.
+
+    Attributes:
+        levels: The nodes of the graph, grouped in topological order.
+        needs_request: Whether any of the nodes takes the request.
+    """
+
+    def __init__(self, handler_dependencies: dict[str, Dependency]):
+        self.handler_dependencies = handler_dependencies
+
+        nodes: dict[Hashable, Dependency] = {}
+        queue = list(handler_dependencies.values())
+        for node in queue:  # Walk the graph in declaration order
+            if node.key not in nodes:
+                nodes[node.key] = node
+                queue.extend(node.sub_dependencies.values())
+
+        self.levels: list[list[Dependency]] = [
+            []
+            for _ in range(max((node.depth for node in nodes.values()), default=-1) + 1)
+        ]
+        for node in nodes.values():
+            self.levels[node.depth].append(node)
+
+        self.needs_request = any(node.request_params for node in nodes.values())
+
+    def __bool__(self) -> bool:
+        return bool(self.handler_dependencies)
+
+    async def resolve(
+        self,
+        state: State,
+        request: Optional[Request],
+        params: dict[str, Any],
+        cache: dict[Hashable, Any],
+    ) -> dict[str, Any]:
+        """Resolves the dependencies for a single request.
+
+        Args:
+            state: The application's state.
+            request: The request, if any of the dependencies takes it.
+            params: The parsed path and query parameters of the request.
+            cache: The tasks of app scoped dependencies, shared across
+              requests.
+
+        Returns:
+            A dict of the handler's parameter names and the values that
+            should be passed to them.
+        """
+
+        results: dict[Hashable, Any] = {}
+
+        for level in self.levels:
+            nodes, awaitables = [], []
+            for node in level:
+                if node.scope != "app":
+                    awaitables.append(node(state, request, params, results))
+                else:
+                    task = cache.get(node.key)
+                    if task is None:
+                        # The first request to reach an app scoped dependency
+                        # calls it in a task of its own, which concurrent
+                        # requests wait for, and which isn't cancelled or
+                        # failed along with the request
+                        task = cache[node.key] = asyncio.ensure_future(
+                            resolve_app_dependency(node, state, results, cache)
+                        )
+                    elif task.done():
+                        results[node.key] = task.result()
+                        continue
+
+                    awaitables.append(asyncio.shield(task))
+                nodes.append(node)
+
+            if len(awaitables) == 1:
+                # Avoid scheduling tasks for a single dependency
+                values = [await awaitables[0]]
+            elif awaitables:
+                values = await asyncio.gather(*awaitables)
+            else:
+                continue
+
+            for node, value in zip(nodes, values):
+                results[node.key] = value
+
+        return {
+            name: results[node.key] for name, node in self.handler_dependencies.items()
+        }
+
+
+async def resolve_app_dependency(
+    node: Dependency,
+    state: State,
+    results: dict[Hashable, Any],
+    cache: dict[Hashable, Any],
+) -> Any:
+    """Calls an app scoped dependency, on behalf of every request.
+
+    Args:
+        node: The node of the dependency.
+        state: The application's state.
+        results: The results of the dependencies it depends on.
+        cache: The tasks of app scoped dependencies, shared across requests.
+
+    Returns:
+        The result of the dependency.
+    """
+
+    try:
+        return await node(state, None, {}, results)
+    except BaseException:
+        del cache[node.key]  # The next request calls the dependency again
+        raise
+
+
+def get_dependencies(signature: inspect.Signature) -> dict[str, Depends]:
+    """Gets the parameters of a signature which are declared as dependencies.
+
+    Args:
+        signature: The signature to inspect.
+
+    Returns:
+        A dict of parameter names and their `Depends` declarations.
+    """
+
+    return {
+        name: param.default
+        for name, param in signature.parameters.items()
+        if isinstance(param.default, Depends)
+    }
+
+
+def compile_dependency(
+    depends: Depends,
+    compiled: dict[Hashable, Dependency],
+    resolving: Optional[set[Hashable]] = None,
+) -> Dependency:
+    """Compiles a dependency declaration, and its sub-dependencies, into a node.
+
+    Args:
+        depends: The dependency declaration to compile.
+        compiled: Nodes which have already been compiled, reused so that
+          every cached dependency only appears once in a graph.
+        resolving: The dependencies which are currently being compiled,
+          used for detecting cycles.
+
+    Returns:
+        The compiled node.
+
+    Raises:
+        AttributeError: Raised when the dependencies form a cycle, or when an
+          app scoped dependency depends on a request scoped one, or takes the
+          request or path and query parameters.
+    """
+
+    resolving = resolving if resolving is not None else set()
+
+    if depends.key in compiled:
+        return compiled[depends.key]
+
+    if depends.dependency in resolving:
+        raise AttributeError(f"Circular dependency on {depends!r}")
+
+    resolving.add(depends.dependency)
+
+    from arc.routing.dispatch import compile_coercers  # arc.routing imports this module
+
+    signature = inspect.signature(depends.dependency)
+    params, state_params, request_params, sub_dependencies = [], [], [], {}
+    types = {}
+
+    for name, param in signature.parameters.items():
+        if isinstance(param.default, Depends):
+            sub = compile_dependency(param.default, compiled, resolving)
+            if depends.scope == "app" and sub.scope == "request":
+                raise AttributeError(
+                    f"App scoped dependency {depends!r} cannot depend on request "
+                    f"scoped dependency {param.default!r}"
+                )
+            sub_dependencies[name] = sub
+        elif param.annotation is State:
+            state_params.append(name)
+        elif param.annotation is Request:
+            if depends.scope == "app":
+                raise AttributeError(
+                    f"App scoped dependency {depends!r} cannot take the request"
+                )
+            request_params.append(name)
+        else:
+            if depends.scope == "app":
+                # Its result would be cached with the first request's values
+                raise AttributeError(
+                    f"App scoped dependency {depends!r} cannot take the path or "
+                    f"query parameter {name}"
+                )
+            params.append((name, param.default))
+            if param.annotation is not param.empty:
+                types[name] = param.annotation
+
+    resolving.discard(depends.dependency)
+
+    coercers = compile_coercers(types)
+    params = [(name, default, coercers.get(name)) for name, default in params]
+
+    node = Dependency(depends, params, state_params, request_params, sub_dependencies)
+    compiled[depends.key] = node
+    return node
+
+
+def compile_dependencies(signature: inspect.Signature) -> DependencyGraph:
+    """Compiles the dependency graph for a route handler.
+
+    Args:
+        signature: The signature of the handler.
+
+    Returns:
+        The compiled dependency graph of the handler.
+    """
+
+    compiled: dict[Hashable, Dependency] = {}
+
+    return DependencyGraph(
+        {
+            name: compile_dependency(depends, compiled)
+            for name, depends in get_dependencies(signature).items()
+        }
+    )
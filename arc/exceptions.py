@@ -96,3 +96,15 @@ class Forbidden(ArcException):
         message: Optional[Union[str, bytes]] = None,
     ):
         super().__init__(message, self.status_code)
+
+
+class PayloadTooLarge(ArcException):
+    """413 exception, payload too large"""
+
+    status_code = 413
+
+    def __init__(
+        self,
+        message: Optional[Union[str, bytes]] = None,
+    ):
+        super().__init__(message, self.status_code)
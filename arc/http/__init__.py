@@ -1,3 +1,4 @@
+from arc.http.forms import FormData, UploadFile
 from arc.http.headers import Headers
 from arc.http.requests import Request
 from arc.http.responses import *
@@ -0,0 +1,421 @@
+from typing import Any, Iterable, Iterator, Optional, Union
+from urllib.parse import parse_qsl
+
+from arc.exceptions import BadRequest, PayloadTooLarge
+
+MAX_PARTS = 1000  # The maximum number of fields and files in a form
+MAX_FIELD_SIZE = 1024 * 1024  # The maximum size of a field which isn't a file
+MAX_HEADERS_SIZE = 16 * 1024  # The maximum size of the headers of a part
+SPOOL_MAX_SIZE = 1024 * 1024  # The size above which files are written to disk
+DISK_BATCH_SIZE = 1024 * 1024  # The amount of a file on disk written at once
+
+
+def parse_options_header(value: str) -> tuple[str, dict[str, str]]:
+    """Parses a header value with options, such as `Content-Type`.
+
+    Args:
+        value: The value of the header.
+
+    Returns:
+        A tuple of the lowercased main value and a dict of its options.
+    """
+
+    main, *params = value.split(";")
+    options = {}
+
+    for param in params:
+        key, _, option = param.strip().partition("=")
+        if len(option) >= 2 and option[0] == option[-1] == '"':
+            option = option[1:-1].replace('\\"', '"')
+        options[key.lower()] = option
+
+    return main.strip().lower(), options
+
+
+class UploadFile:
+    """A file uploaded as a part of a multipart form
+
+    The contents of the file are held in memory until they exceed a size
+    threshold, after which they're written to a temporary file on disk.
+
+    Args:
+        filename: The name of the file, as given by the client.
+        content_type: The content type of the file.
+        spool_max_size: The size, in bytes, above which the file is
+          written to disk.
+
+    Attributes:
+        filename: The name of the file, as given by the client.
+        content_type: The content type of the file.
+        file: The underlying `SpooledTemporaryFile`.
+        size: The size of the file in bytes.
+    """
+
+    __slots__ = ("filename", "content_type", "file", "size")
+
+    def __init__(
+        self,
+        filename: str,
+        content_type: Optional[str] = "application/octet-stream",
+        spool_max_size: Optional[int] = SPOOL_MAX_SIZE,
+    ):
+        from tempfile import SpooledTemporaryFile  # Only imported for uploads
+
+        self.filename = filename
+        self.content_type = content_type
+        self.file = SpooledTemporaryFile(max_size=spool_max_size)
+        self.size = 0
+
+    @property
+    def in_memory(self) -> bool:
+        """Whether the contents of the file are still held in memory."""
+
+        return not self.file._rolled
+
+    def write(self, data: Union[bytes, memoryview]):
+        self.size += len(data)
+        self.file.write(data)
+
+    async def read(self, size: Optional[int] = -1) -> bytes:
+        return self.file.read(size)
+
+    async def seek(self, offset: int):
+        self.file.seek(offset)
+
+    async def close(self):
+        self.file.close()
+
+    def __repr__(self) -> str:
+        return f"UploadFile(filename={self.filename!r}, size={self.size})"
+
+
+class FormData:
+    """Multidict storing the fields of a parsed form
+
+    Allows for multiple values for every key. Values are either strings,
+    or `UploadFile` objects for uploaded files.
+
+    Args:
+        items: A list of tuples containing the fields of the form.
+    """
+
+    __slots__ = ("_list",)
+
+    def __init__(self, items: Optional[list[tuple[str, Any]]] = None):
+        self._list = items if items is not None else []
+
+    def keys(self) -> list[str]:
+        return [key for key, _ in self._list]
+
+    def items(self) -> list[tuple[str, Any]]:
+        return list(self._list)
+
+    def values(self) -> list[Any]:
+        return [value for _, value in self._list]
+
+    def getlist(self, key: str) -> list[Any]:
+        return [v for k, v in self._list if k == key]
+
+    def __getitem__(self, key: str) -> Any:
+        for k, v in self._list:
+            if k == key:
+                return v
+
+        raise KeyError(key)
+
+    def get(self, key: str, default: Optional[Any] = None) -> Any:
+        try:
+            return self.__getitem__(key)
+        except KeyError:
+            return default
+
+    def __contains__(self, key: str) -> bool:
+        return any(k == key for k, _ in self._list)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return len(self._list)
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, FormData):
+            return False
+
+        return self._list == other._list
+
+    async def close(self):
+        """Closes every file in the form."""
+
+        for _, value in self._list:
+            if isinstance(value, UploadFile):
+                await value.close()
+
+
+def parse_urlencoded(
+    body: Union[bytes, bytearray], max_parts: Optional[int] = MAX_PARTS
+) -> FormData:
+    """Parses an `application/x-www-form-urlencoded` body.
+
+    Args:
+        body: The body of the request.
+        max_parts: The maximum number of fields in the form.
+
+    Returns:
+        The parsed form.
+
+    Raises:
+        BadRequest: Raised when the form has more fields than allowed, or
+          isn't valid UTF-8.
+    """
+
+    # Counted the same way parse_qsl counts fields for max_num_fields
+    if body.count(b"&") + 1 > max_parts:
+        raise BadRequest(f"Form has more than {max_parts} fields")
+
+    try:
+        pairs = parse_qsl(body.decode("utf-8"), keep_blank_values=True, errors="strict")
+    except UnicodeDecodeError:
+        raise BadRequest("Form isn't valid UTF-8") from None
+
+    return FormData(pairs)
+
+
+# The states of the multipart parser
+PREAMBLE, AFTER_BOUNDARY, HEADERS, BODY, END = range(5)
+
+
+class MultiPartParser:
+    """Incremental `multipart/form-data` parser
+
+    The body is fed to the parser in chunks as they arrive, and the parser
+    only ever buffers as much of it as it needs to find the next boundary.
+    Fields are collected in memory, while files are written to `UploadFile`
+    objects.
+
+    Args:
+        boundary: The boundary of the multipart body.
+        max_parts: The maximum number of fields and files in the form.
+        max_field_size: The maximum size of a field which isn't a file.
+        max_file_size: The maximum size of a file, or None for no limit.
+        spool_max_size: The size above which files are written to disk.
+
+    Attributes:
+        items: The fields and files which have been parsed so far.
+    """
+
+    def __init__(
+        self,
+        boundary: bytes,
+        *,
+        max_parts: Optional[int] = MAX_PARTS,
+        max_field_size: Optional[int] = MAX_FIELD_SIZE,
+        max_file_size: Optional[int] = None,
+        spool_max_size: Optional[int] = SPOOL_MAX_SIZE,
+    ):
+        self.max_parts = max_parts
+        self.max_field_size = max_field_size
+        self.max_file_size = max_file_size
+        self.spool_max_size = spool_max_size
+
+        self.items: list[tuple[str, Any]] = []
+
+        self._delimiter = b"\r\n--" + boundary
+        self._buffer = bytearray()
+        self._state = PREAMBLE
+        self._name: Optional[str] = None
+        self._charset = "utf-8"
+        self._field: Optional[bytearray] = None
+        self._file: Optional[UploadFile] = None
+
+    def feed(self, data: bytes):
+        """Parses a chunk of the body.
+
+        Args:
+            data: The next chunk of the body.
+
+        Raises:
+            BadRequest: Raised when the body is malformed, has more parts
+              than allowed, or has a field which can't be decoded.
+            PayloadTooLarge: Raised when a part is larger than allowed.
+        """
+
+        buffer = self._buffer
+        buffer += data
+
+        while True:
+            if self._state == BODY:
+                if not self._parse_body():
+                    return
+            elif self._state == PREAMBLE:
+                # The first boundary isn't preceded by a line break
+                index = buffer.find(self._delimiter[2:])
+                if index == -1:
+                    # Keep what could be the start of the boundary
+                    del buffer[: max(len(buffer) - len(self._delimiter), 0)]
+                    return
+
+                del buffer[: index + len(self._delimiter) - 2]
+                self._state = AFTER_BOUNDARY
+            elif self._state == AFTER_BOUNDARY:
+                if len(buffer) < 2:
+                    return
+
+                if buffer.startswith(b"--"):
+                    buffer.clear()
+                    self._state = END
+                elif buffer.startswith(b"\r\n"):
+                    del buffer[:2]
+                    self._state = HEADERS
+                else:
+                    raise BadRequest("Malformed multipart body")
+            elif self._state == HEADERS:
+                index = buffer.find(b"\r\n\r\n")
+                if index == -1:
+                    if len(buffer) > MAX_HEADERS_SIZE:
+                        raise BadRequest("Multipart part headers are too large")
+                    return
+
+                self._start_part(bytes(buffer[:index]))
+                del buffer[: index + 4]
+                self._state = BODY
+            else:  # END, the epilogue is ignored
+                buffer.clear()
+                return
+
+    def feed_all(self, chunks: Iterable[bytes]):
+        """Parses several consecutive chunks of the body.
+
+        Args:
+            chunks: The next chunks of the body, in order.
+        """
+
+        for chunk in chunks:
+            self.feed(chunk)
+
+    @property
+    def on_disk(self) -> bool:
+        """Whether the file currently being parsed is written to disk."""
+
+        return self._file is not None and not self._file.in_memory
+
+    def _start_part(self, raw_headers: bytes):
+        if len(self.items) >= self.max_parts:
+            raise BadRequest(f"Form has more than {self.max_parts} parts")
+
+        disposition, content_type = None, None
+        for line in raw_headers.decode("latin-1").split("\r\n"):
+            key, _, value = line.partition(":")
+            key = key.strip().lower()
+            if key == "content-disposition":
+                disposition = parse_options_header(value)
+            elif key == "content-type":
+                content_type = value.strip()
+
+        if disposition is None or "name" not in disposition[1]:
+            raise BadRequest("Multipart part is missing a field name")
+
+        options = disposition[1]
+        self._name = options["name"]
+
+        if "filename" in options:
+            self._file = UploadFile(
+                options["filename"],
+                content_type or "application/octet-stream",
+                self.spool_max_size,
+            )
+        else:
+            self._field = bytearray()
+            if content_type is not None:
+                self._charset = parse_options_header(content_type)[1].get(
+                    "charset", "utf-8"
+                )
+
+    def _parse_body(self) -> bool:
+        """Writes the data of the current part up to the next boundary.
+
+        Returns:
+            Whether the end of the part was found.
+        """
+
+        buffer = self._buffer
+        index = buffer.find(self._delimiter)
+
+        if index == -1:
+            # All but the last few bytes, which could be the start of the
+            # boundary, belong to the current part
+            end = len(buffer) - len(self._delimiter) + 1
+            if end > 0:
+                with memoryview(buffer) as view:
+                    self._write(view[:end])
+                del buffer[:end]
+            return False
+
+        with memoryview(buffer) as view:
+            self._write(view[:index])
+        del buffer[: index + len(self._delimiter)]
+
+        self._finish_part()
+        self._state = AFTER_BOUNDARY
+        return True
+
+    def _write(self, data: memoryview):
+        if self._file is not None:
+            if (
+                self.max_file_size is not None
+                and self._file.size + len(data) > self.max_file_size
+            ):
+                raise PayloadTooLarge(
+                    f"File {self._file.filename} is larger than {self.max_file_size} bytes"
+                )
+            self._file.write(data)
+        else:
+            if len(self._field) + len(data) > self.max_field_size:
+                raise PayloadTooLarge(
+                    f"Field {self._name} is larger than {self.max_field_size} bytes"
+                )
+            self._field += data
+
+    def _finish_part(self):
+        if self._file is not None:
+            self._file.file.seek(0)
+            self.items.append((self._name, self._file))
+            self._file = None
+        else:
+            try:
+                value = self._field.decode(self._charset)
+            except (UnicodeDecodeError, LookupError):
+                # An invalid value, or a charset which doesn't exist
+                raise BadRequest(
+                    f"Field {self._name} isn't valid {self._charset}"
+                ) from None
+
+            self.items.append((self._name, value))
+            self._field = None
+            self._charset = "utf-8"
+
+    def close(self) -> FormData:
+        """Finishes parsing the body.
+
+        Returns:
+            The parsed form.
+
+        Raises:
+            BadRequest: Raised when the body ended before the final boundary.
+        """
+
+        if self._state != END:
+            self.discard()
+            raise BadRequest("Multipart body ended unexpectedly")
+
+        return FormData(self.items)
+
+    def discard(self):
+        """Closes every file which has been parsed so far."""
+
+        if self._file is not None:
+            self._file.file.close()
+
+        for _, value in self.items:
+            if isinstance(value, UploadFile):
+                value.file.close()
@@ -6,35 +6,60 @@ class Headers:
 
     Stores http headers in a key-value format. Allows for multiple
     values for every key. Keys and values are encoded in latin-1.
+    Headers which are already encoded, such as the ones in an ASGI
+    scope, are used as they are. The headers are only encoded once
+    they're first accessed.
 
     Args:
         values: A mapping or a list of tuples containing the
           default headers.
     """
 
+    __slots__ = ("_values", "_list")
+
     def __init__(self, values: Union[Mapping[str, str], list[tuple[bytes, bytes]]]):
-        if values:
-            _items = list(values.items()) if hasattr(values, "items") else list(values)
-        else:
-            _items = []
+        self._values = values
+        self._list: Optional[list[tuple[bytes, bytes]]] = None
+
+    @property
+    def raw(self) -> list[tuple[bytes, bytes]]:
+        """A list of the latin-1 encoded headers
+
+        Returns:
+            A list of tuples which contain bytes.
+        """
+
+        if self._list is None:
+            values = self._values
+            items = list(values.items()) if hasattr(values, "items") else values
+
+            if not items:
+                self._list = []
+            elif isinstance(items, list) and isinstance(items[0][0], bytes):
+                self._list = items  # ASGI headers are already encoded
+            else:
+                self._list = [
+                    (key.lower().encode("latin-1"), value.lower().encode("latin-1"))
+                    for key, value in items
+                ]
+
+            self._values = None
 
-        self._list = [
-            (key.lower().encode("latin-1"), value.lower().encode("latin-1"))
-            for key, value in _items
-        ]
+        return self._list
 
     def keys(self) -> list[str]:
-        return [key.decode("latin-1") for key, _ in self._list]
+        return [key.decode("latin-1") for key, _ in self.raw]
 
     def items(self) -> list[tuple[str, str]]:
-        return [(k.decode("latin-1"), v.decode("latin-1")) for k, v in self._list]
+        return [(k.decode("latin-1"), v.decode("latin-1")) for k, v in self.raw]
 
     def values(self) -> list[str]:
-        return [value.decode("latin-1") for value, _ in self._list]
+        return [value.decode("latin-1") for value, _ in self.raw]
 
     def __getitem__(self, key: str) -> str:
-        for k, v in self._list:
-            if k.lower() == key.lower().encode("latin-1"):
+        encoded = key.lower().encode("latin-1")
+        for k, v in self.raw:
+            if k.lower() == encoded:
                 return v.decode("latin-1")
 
         raise KeyError(key)
@@ -49,11 +74,12 @@ class Headers:
         if not isinstance(other, Headers):
             return False
 
-        return self._list == other._list
+        return self.raw == other.raw
 
     def __contains__(self, key: str) -> bool:
-        for k, v in self._list:
-            if k.lower() == key.lower().encode("latin-1"):
+        encoded = key.lower().encode("latin-1")
+        for k, v in self.raw:
+            if k.lower() == encoded:
                 return True
 
         return False
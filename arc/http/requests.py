@@ -1,8 +1,48 @@
-from typing import Optional, Union
+import asyncio
+from typing import AsyncIterator, Iterable, Optional, Union
+
+from arc.exceptions import BadRequest, PayloadTooLarge
+from arc.http.forms import (
+    DISK_BATCH_SIZE,
+    MAX_FIELD_SIZE,
+    MAX_PARTS,
+    SPOOL_MAX_SIZE,
+    FormData,
+    MultiPartParser,
+    parse_options_header,
+    parse_urlencoded,
+)
+from arc.http.headers import Headers
+from arc.http.responses import send_early_hints
 from arc.types import CoroutineFunction
 
 
 class Request:
+    """An incoming HTTP request
+
+    Wraps the ASGI scope and the receive and send callables of
+    an HTTP request. Attributes derived from the scope are only
+    created once they're first accessed.
+
+    Args:
+        scope: The ASGI scope of the request.
+        receive: The ASGI receive callable.
+        send: The ASGI send callable.
+
+    Attributes:
+        scope: The ASGI scope of the request.
+    """
+
+    __slots__ = (
+        "scope",
+        "_receive",
+        "_send",
+        "_headers",
+        "_body",
+        "_form",
+        "_consumed",
+    )
+
     def __init__(
         self, scope: dict, receive: CoroutineFunction, send: CoroutineFunction
     ):
@@ -12,5 +52,185 @@ class Request:
         self.scope = scope
         self._receive = receive
         self._send = send
+        self._headers: Optional[Headers] = None
+        self._body: Optional[bytes] = None
+        self._form: Optional[FormData] = None
+        self._consumed = False
+
+    @property
+    def method(self) -> str:
+        return self.scope["method"]
+
+    @property
+    def path(self) -> str:
+        return self.scope["path"]
+
+    @property
+    def headers(self) -> Headers:
+        if self._headers is None:
+            self._headers = Headers(self.scope.get("headers"))
+
+        return self._headers
+
+    async def send_early_hints(self, links: Iterable[Union[str, bytes]]) -> bool:
+        """Sends a 103 Early Hints response, if the server supports it.
+
+        Should be called before slow work in a handler, so that clients can
+        start fetching the resources the response depends on in the meantime.
+
+        Args:
+            links: The values of the `Link` headers to send, such as
+              `</style.css>; rel=preload; as=style`.
+
+        Returns:
+            Whether the early hints were sent.
+        """
+
+        return await send_early_hints(self.scope, self._send, links)
+
+    async def stream(self) -> AsyncIterator[bytes]:
+        """Iterates over the chunks of the body as they're received.
+
+        Yields:
+            The chunks of the body.
+
+        Raises:
+            RuntimeError: Raised when the body has already been streamed.
+            BadRequest: Raised when the client disconnects before the body
+              is received.
+        """
+
+        if self._body is not None:
+            yield self._body
+            return
+
+        if self._consumed:
+            raise RuntimeError("The request body has already been streamed")
+
+        self._consumed = True
+
+        while True:
+            message = await self._receive()
+            if message["type"] == "http.disconnect":
+                raise BadRequest("Client disconnected")
+
+            body = message.get("body", b"")
+            if body:
+                yield body
+
+            if not message.get("more_body", False):
+                return
+
+    async def body(self) -> bytes:
+        """Reads the whole body of the request.
+
+        Returns:
+            The body of the request.
+        """
+
+        if self._body is None:
+            chunks = [chunk async for chunk in self.stream()]
+            # Avoid copying bodies which arrive in a single chunk
+            self._body = chunks[0] if len(chunks) == 1 else b"".join(chunks)
+
+        return self._body
+
+    async def form(
+        self,
+        *,
+        max_parts: Optional[int] = MAX_PARTS,
+        max_field_size: Optional[int] = MAX_FIELD_SIZE,
+        max_file_size: Optional[int] = None,
+        spool_max_size: Optional[int] = SPOOL_MAX_SIZE,
+    ) -> FormData:
+        """Parses the body of the request as a form.
+
+        Supports `multipart/form-data` and `application/x-www-form-urlencoded`
+        bodies. Multipart bodies are parsed as they're received, with files
+        being written to temporary files once they exceed `spool_max_size`.
+        Once a file is on disk, its chunks are parsed in batches in the event
+        loop's executor, so that writing them doesn't block the loop.
+
+        Args:
+            max_parts: The maximum number of fields and files in the form.
+            max_field_size: The maximum size of a field which isn't a file,
+              and of the whole body of an urlencoded form.
+            max_file_size: The maximum size of a file, or None for no limit.
+            spool_max_size: The size above which files are written to disk.
+
+        Returns:
+            The parsed form.
+
+        Raises:
+            BadRequest: Raised when the body isn't a valid form, or has more
+              parts than allowed.
+            PayloadTooLarge: Raised when a part of the form is larger than
+              allowed.
+        """
+
+        if self._form is not None:
+            return self._form
+
+        content_type, options = parse_options_header(
+            self.headers.get("content-type", "")
+        )
+
+        if content_type == "multipart/form-data":
+            if "boundary" not in options:
+                raise BadRequest("Multipart form is missing a boundary")
+
+            parser = MultiPartParser(
+                options["boundary"].encode("latin-1"),
+                max_parts=max_parts,
+                max_field_size=max_field_size,
+                max_file_size=max_file_size,
+                spool_max_size=spool_max_size,
+            )
+
+            batch: list[bytes] = []
+            batch_size = 0
+            feeding = None
+
+            try:
+                async for chunk in self.stream():
+                    if not batch and not parser.on_disk:
+                        parser.feed(chunk)
+                        continue
+
+                    # Chunks of a file on disk are written in batches, to
+                    # amortize the cost of handing them to the executor
+                    batch.append(chunk)
+                    batch_size += len(chunk)
+                    if batch_size >= DISK_BATCH_SIZE:
+                        loop = asyncio.get_event_loop()
+                        feeding = loop.run_in_executor(None, parser.feed_all, batch)
+                        await asyncio.shield(feeding)
+                        batch, batch_size = [], 0
+
+                if batch:
+                    loop = asyncio.get_event_loop()
+                    feeding = loop.run_in_executor(None, parser.feed_all, batch)
+                    await asyncio.shield(feeding)
+            except BaseException:
+                if feeding is not None and not feeding.done():
+                    # Don't close the files while the executor writes to them
+                    feeding.add_done_callback(lambda _: parser.discard())
+                else:
+                    parser.discard()
+                raise
+
+            self._form = parser.close()
+        elif content_type == "application/x-www-form-urlencoded":
+            size, chunks = 0, []
+            async for chunk in self.stream():
+                size += len(chunk)
+                if size > max_field_size:
+                    raise PayloadTooLarge(f"Form is larger than {max_field_size} bytes")
+                chunks.append(chunk)
 
+            self._body = chunks[0] if len(chunks) == 1 else b"".join(chunks)
+            self._form = parse_urlencoded(self._body, max_parts)
+        else:
+            raise BadRequest(f"Unsupported form content type {content_type}")
 
+        return self._form
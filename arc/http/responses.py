@@ -1,9 +1,66 @@
-from typing import Any, Optional, Union
-
-import orjson
+from typing import Any, Iterable, Optional, Union
 
 from arc.types import CoroutineFunction
 
+EARLY_HINTS_EXTENSION = "http.response.early_hint"
+TRAILERS_EXTENSION = "http.response.trailers"
+
+
+def supports_extension(scope: dict, extension: str) -> bool:
+    """Checks whether the server advertises an ASGI extension.
+
+    Args:
+        scope: The ASGI scope of the request.
+        extension: The name of the extension.
+
+    Returns:
+        Whether the extension is in the scope's extensions.
+    """
+
+    extensions = scope.get("extensions")
+    return extensions is not None and extension in extensions
+
+
+def encode_links(links: Iterable[Union[str, bytes]]) -> tuple[bytes, ...]:
+    """Encodes `Link` header values for early hints.
+
+    Args:
+        links: The values of the `Link` headers, such as
+          `</style.css>; rel=preload; as=style`.
+
+    Returns:
+        A tuple of the latin-1 encoded values.
+    """
+
+    return tuple(
+        link if isinstance(link, bytes) else link.encode("latin-1") for link in links
+    )
+
+
+async def send_early_hints(
+    scope: dict, send: CoroutineFunction, links: Iterable[Union[str, bytes]]
+) -> bool:
+    """Sends a 103 Early Hints response, if the server supports it.
+
+    Lets clients start fetching the resources a response depends on before
+    the response itself is ready. Can be sent any number of times before
+    the final response.
+
+    Args:
+        scope: The ASGI scope of the request.
+        send: The ASGI send callable.
+        links: The values of the `Link` headers to send.
+
+    Returns:
+        Whether the early hints were sent.
+    """
+
+    if not supports_extension(scope, EARLY_HINTS_EXTENSION):
+        return False
+
+    await send({"type": EARLY_HINTS_EXTENSION, "links": list(encode_links(links))})
+    return True
+
 
 class HTTPResponse:
     """Base HTTP response object
@@ -18,6 +75,9 @@ class HTTPResponse:
           defaults to 200.
         headers: A dictionary which represents the HTTP
           headers for the response.
+        trailers: A dictionary which represents the HTTP
+          trailers for the response, sent after the body. Only
+          sent when the server supports the trailers extension.
 
     Attributes:
         body: The body of the response, is either bytes
@@ -25,8 +85,12 @@ class HTTPResponse:
         status_code: The status code of the response.
         headers: A dictionary which represents the HTTP
           headers for the response.
+        trailers: A dictionary which represents the HTTP
+          trailers for the response.
     """
 
+    __slots__ = ("body", "status_code", "_headers", "trailers")
+
     content_type: Optional[str] = None
 
     def __init__(
@@ -36,15 +100,28 @@ class HTTPResponse:
         status_code: Optional[int] = 200,
         headers: Optional[dict] = None,
         content_type: Optional[str] = None,
+        trailers: Optional[dict] = None,
     ):
         if isinstance(body, str):
             body = body.encode("utf-8")
         self.body = body
         self.status_code = status_code
-        self.headers = headers or {}
+        self._headers = headers  # Only create a dict once headers are needed
+        self.trailers = trailers
         if content_type is not None:
             self.headers["content-type"] = content_type
 
+    @property
+    def headers(self) -> dict:
+        if self._headers is None:
+            self._headers = {}
+
+        return self._headers
+
+    @headers.setter
+    def headers(self, headers: dict):
+        self._headers = headers
+
     @property
     def raw_headers(self) -> list[tuple[bytes, bytes]]:
         """A list of raw header values
@@ -52,7 +129,7 @@ class HTTPResponse:
         Returns:
             A list of tuples which contain bytes.
         """
-        if self.headers is None:
+        if not self._headers:
             return []
 
         raw_headers = [
@@ -63,6 +140,10 @@ class HTTPResponse:
     async def __call__(
         self, scope: dict, receive: CoroutineFunction, send: CoroutineFunction
     ):
+        if self.trailers and supports_extension(scope, TRAILERS_EXTENSION):
+            await self.send_with_trailers(send)
+            return
+
         await send(
             {
                 "type": "http.response.start",
@@ -78,6 +159,47 @@ class HTTPResponse:
             }
         )
 
+    async def send_with_trailers(self, send: CoroutineFunction):
+        """Sends the response, followed by its trailers.
+
+        Announces the names of the trailers in the `Trailer` header.
+
+        Args:
+            send: The ASGI send callable.
+        """
+
+        raw_trailers = [
+            (k.lower().encode("latin-1"), v.encode("latin-1"))
+            for k, v in self.trailers.items()
+        ]
+
+        await send(
+            {
+                "type": "http.response.start",
+                "status": self.status_code,
+                "headers": [
+                    *self.raw_headers,
+                    (b"trailer", b", ".join(name for name, _ in raw_trailers)),
+                ],
+                "trailers": True,
+            }
+        )
+
+        await send(
+            {
+                "type": "http.response.body",
+                "body": self.body,
+            }
+        )
+
+        await send(
+            {
+                "type": TRAILERS_EXTENSION,
+                "headers": raw_trailers,
+                "more_trailers": False,
+            }
+        )
+
 
 class JSONResponse(HTTPResponse):
     """HTTP response with the content being JSON
@@ -92,7 +214,11 @@ class JSONResponse(HTTPResponse):
           the response.
     """
 
+    __slots__ = ()
+
     def __init__(self, data: Any, *args, **kwargs):
+        import orjson
+
         body = orjson.dumps(data)
 
         super().__init__(
@@ -106,4 +232,6 @@ class JSONResponse(HTTPResponse):
 class HTMLResponse(HTTPResponse):
     """HTTP response with the content being HTML"""
 
+    __slots__ = ()
+
     content_type = "text/html"
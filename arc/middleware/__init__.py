@@ -1 +1,2 @@
-from errors import ExceptionMiddleware
+from arc.middleware.accesslog import AccessLogMiddleware
+from arc.middleware.errors import ExceptionMiddleware
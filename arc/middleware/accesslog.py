@@ -0,0 +1,297 @@
+import asyncio
+import os
+import random
+import sys
+import threading
+import time
+import weakref
+from typing import BinaryIO, Mapping, Optional
+
+from arc.types import CoroutineFunction
+
+# The fields of every record, in the order they're stored in the ring buffer
+FIELDS = (
+    "time",
+    "method",
+    "path",
+    "route",
+    "status",
+    "bytes",
+    "duration_ms",
+    "ttfb_ms",
+)
+
+
+class RingBuffer:
+    """Fixed size, single producer and single consumer queue
+
+    All of the slots are allocated upfront. The producer, the event loop,
+    never blocks or waits for a lock, and a record which doesn't fit is
+    dropped and counted instead. The consumer is a background thread.
+
+    Args:
+        capacity: The number of records the buffer can hold.
+
+    Attributes:
+        capacity: The number of records the buffer can hold.
+        dropped: The number of records which were dropped because the
+          buffer was full.
+    """
+
+    __slots__ = ("capacity", "dropped", "_slots", "_written", "_read")
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.dropped = 0
+        self._slots: list[Optional[tuple]] = [None] * capacity
+        self._written = 0  # Only ever incremented by the producer
+        self._read = 0  # Only ever incremented by the consumer
+
+    def __len__(self) -> int:
+        return self._written - self._read
+
+    def put(self, record: tuple) -> bool:
+        """Adds a record to the buffer, unless it's full.
+
+        Returns:
+            Whether the record was added.
+        """
+
+        written = self._written
+        if written - self._read >= self.capacity:
+            self.dropped += 1
+            return False
+
+        self._slots[written % self.capacity] = record
+        self._written = written + 1  # Publish the record once it's in place
+        return True
+
+    def drain(self, limit: int) -> list[tuple]:
+        """Removes up to `limit` records from the buffer.
+
+        Returns:
+            The removed records, oldest first.
+        """
+
+        read = self._read
+        end = min(self._written, read + limit)
+        records = []
+
+        for index in range(read, end):
+            slot = index % self.capacity
+            records.append(self._slots[slot])
+            self._slots[slot] = None
+
+        self._read = end
+        return records
+
+
+class AccessLogMiddleware:
+    """Records an access log entry for every HTTP request
+
+    Every request is recorded as a tuple in a preallocated ring buffer, on
+    the event loop, without any formatting or IO. A background thread drains
+    the buffer in batches, serializes the records to JSON lines with orjson
+    and writes them to the sink. When the buffer is full, records are
+    dropped and counted, so logging never slows down requests.
+
+    Args:
+        app: The ASGI application to wrap.
+        sink: A binary file to write the log to, defaults to stdout.
+        capacity: The number of records the ring buffer can hold.
+        batch_size: The maximum number of records written at once.
+        flush_interval: The maximum time in seconds between writes.
+        sample_rates: A mapping of status classes, such as 2 for 2xx
+          responses, to the fraction of their requests which is logged.
+          Classes which aren't included are always logged.
+
+    Attributes:
+        buffer: The ring buffer of pending records.
+        logged: The number of records which have been written.
+        sampled_out: The number of requests which weren't recorded due to
+          sampling.
+    """
+
+    def __init__(
+        self,
+        app: CoroutineFunction,
+        *,
+        sink: Optional[BinaryIO] = None,
+        capacity: Optional[int] = 8192,
+        batch_size: Optional[int] = 512,
+        flush_interval: Optional[float] = 0.5,
+        sample_rates: Optional[Mapping[int, float]] = None,
+    ):
+        self.app = app
+        self.sink = sink if sink is not None else sys.stdout.buffer
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.sample_rates = [1.0] * 6  # Indexed by status class
+        for status_class, rate in (sample_rates or {}).items():
+            if not 1 <= status_class <= 5:
+                raise AttributeError(f"Invalid status class {status_class}")
+            self.sample_rates[status_class] = rate
+
+        self.buffer = RingBuffer(capacity)
+        self.logged = 0
+        self.sampled_out = 0
+
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._writer: Optional[threading.Thread] = None
+
+        _instances.add(self)
+
+    def _reset(self):
+        self.buffer = RingBuffer(self.buffer.capacity)
+        self.logged = 0
+        self.sampled_out = 0
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._writer = None
+
+    def start(self):
+        """Starts the background thread, which is otherwise started lazily."""
+
+        if self._writer is None:
+            self._writer = threading.Thread(
+                target=self._run, name="arc-access-log", daemon=True
+            )
+            self._writer.start()
+
+    @property
+    def dropped(self) -> int:
+        """The number of records dropped because the buffer was full."""
+
+        return self.buffer.dropped
+
+    def record(self, record: tuple):
+        """Adds a record to the buffer, taking sampling into account."""
+
+        status = record[4]
+        rate = self.sample_rates[status // 100] if 100 <= status < 600 else 1.0
+        if rate < 1.0 and random.random() >= rate:
+            self.sampled_out += 1
+            return
+
+        if self._writer is None:
+            self.start()
+
+        if self.buffer.put(record) and len(self.buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+        self.flush()
+
+    def flush(self):
+        """Writes every pending record to the sink.
+
+        Called from the background thread, and shouldn't be called from
+        anywhere else while it's running.
+        """
+
+        import orjson
+
+        while True:
+            records = self.buffer.drain(self.batch_size)
+            if not records:
+                return
+
+            self.sink.write(
+                b"".join(
+                    orjson.dumps(
+                        dict(zip(FIELDS, record)), option=orjson.OPT_APPEND_NEWLINE
+                    )
+                    for record in records
+                )
+            )
+            self.sink.flush()
+            self.logged += len(records)
+
+    def close(self):
+        """Stops the background thread, after writing every pending record.
+
+        The thread is started again by the next record, if there is one.
+        """
+
+        if self._writer is None:
+            self.flush()
+            return
+
+        self._stopped.set()
+        self._wakeup.set()
+        self._writer.join()
+
+        self._writer = None
+        self._stopped.clear()
+
+    async def __call__(
+        self, scope: dict, receive: CoroutineFunction, send: CoroutineFunction
+    ):
+        if scope["type"] == "lifespan":
+
+            async def lifespan_send(message: dict):
+                if message["type"] == "lifespan.shutdown.complete":
+                    # Flush the log before the server exits, without blocking
+                    # the event loop while the writer finishes
+                    loop = asyncio.get_event_loop()
+                    await loop.run_in_executor(None, self.close)
+                await send(message)
+
+            await self.app(scope, receive, lifespan_send)
+            return
+
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timestamp = time.time()
+        start = time.perf_counter()
+        status = 500
+        size = 0
+        ttfb = 0.0
+
+        async def logged_send(message: dict):
+            nonlocal status, size, ttfb
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                ttfb = time.perf_counter() - start
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, logged_send)
+        finally:
+            route = scope.get("route")
+            self.record(
+                (
+                    timestamp,
+                    scope["method"],
+                    scope["path"],
+                    route.path if route is not None else None,
+                    status,
+                    size,
+                    (time.perf_counter() - start) * 1000,
+                    ttfb * 1000,
+                )
+            )
+
+
+# Every middleware which may have a writer thread, held weakly so that
+# middleware which is no longer used can be garbage collected
+_instances: "weakref.WeakSet[AccessLogMiddleware]" = weakref.WeakSet()
+
+
+def _reset_after_fork():
+    # Threads don't survive a fork, so every worker starts its own writer
+    for middleware in list(_instances):
+        middleware._reset()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
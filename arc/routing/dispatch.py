@@ -0,0 +1,193 @@
+import functools
+import re
+from types import MappingProxyType
+from typing import Any, Callable, Iterable, Mapping, NamedTuple, Optional, Pattern
+
+from arc.routing.router import PARAM_REGEX, PATH_REGEX, Route, compile_path_regex
+
+# Types which query and path parameters already are, and don't need casting
+PASSTHROUGH_TYPES = {Any, str}
+
+
+class RoutePlan(NamedTuple):
+    """The precompiled dispatch information for a single route.
+
+    Attributes:
+        route: The route itself.
+        coercers: A mapping of parameter names to callables which cast the
+          raw parameter value to its declared type.
+        order: The position of the route in the route table, which decides
+          between several routes that match a request.
+    """
+
+    route: Route
+    coercers: Mapping[str, Callable[[Any], Any]]
+    order: int
+
+
+class PathEntry(NamedTuple):
+    """The routes for a single path, across every method.
+
+    Attributes:
+        plans: A mapping of methods to the plans of their routes.
+        allow: The precomputed value of the `Allow` header for the path.
+    """
+
+    plans: Mapping[str, RoutePlan]
+    allow: str
+
+    @classmethod
+    def create(cls, plans: dict[str, RoutePlan]) -> "PathEntry":
+        return cls(
+            MappingProxyType(plans),
+            ", ".join(sorted(method.upper() for method in plans)),
+        )
+
+
+def compile_coercers(types: Mapping[str, Any]) -> Mapping[str, Callable[[Any], Any]]:
+    """Compiles the casting functions for a route's parameters.
+
+    Parameters which are declared as `str` or `Any` are left out, since
+    they're passed to the handler as is.
+
+    Args:
+        types: A mapping of parameter names to their declared types.
+
+    Returns:
+        A read-only mapping of parameter names to casting functions.
+    """
+
+    if all(type_ in PASSTHROUGH_TYPES for type_ in types.values()):
+        return MappingProxyType({})  # Avoid importing pydantic if nothing is cast
+
+    from pydantic import parse_obj_as
+
+    return MappingProxyType(
+        {
+            name: functools.partial(parse_obj_as, type_)
+            for name, type_ in types.items()
+            if type_ not in PASSTHROUGH_TYPES
+        }
+    )
+
+
+class DispatchTable:
+    """An immutable, precompiled form of a route table.
+
+    Dispatches requests exactly like an unfrozen `Router`: the first route,
+    in the order of the route table, which matches both the path and the
+    method of a request handles it, and the `Allow` header of a 405
+    response lists the methods of every route which matches the path.
+
+    Paths without path parameters, which no other route's pattern matches,
+    are looked up in a dict. Every other path is grouped with the paths that
+    have the same pattern, regardless of the names of their path
+    parameters, and the groups are matched in order with a single regex
+    each. Every route is compiled into a `RoutePlan`.
+
+    The table holds no per-request state, so a table which is built before
+    a server forks its workers is shared between them copy-on-write.
+
+    Args:
+        routes: The routes to build the table from, in order.
+
+    Attributes:
+        static: A mapping of paths without path parameters to their entries.
+        dynamic: A tuple of the position of the first route of every
+          pattern, the regex of the pattern and its entry, in order.
+    """
+
+    def __init__(self, routes: Iterable[Route]):
+        plans = [
+            RoutePlan(route, compile_coercers(route.param_types), order)
+            for order, route in enumerate(routes)
+        ]
+
+        # Matches any path which a route with path parameters accepts, only
+        # compiled when there are paths without parameters to check
+        patterns = [
+            f"(?:{PATH_REGEX.sub(PARAM_REGEX, plan.route.path)})"
+            for plan in plans
+            if plan.route.path_params
+        ]
+        parameterized = (
+            re.compile("|".join(patterns))
+            if patterns and len(patterns) < len(plans)
+            else None
+        )
+
+        static: dict[str, dict[str, RoutePlan]] = {}
+        dynamic: dict[str, tuple[int, Pattern, dict[str, RoutePlan]]] = {}
+
+        for plan in plans:
+            route = plan.route
+
+            if not route.path_params and (
+                parameterized is None or not parameterized.fullmatch(route.path)
+            ):
+                static.setdefault(route.path, {}).setdefault(route.method, plan)
+                continue
+
+            key = PATH_REGEX.sub("{}", route.path)
+            if key not in dynamic:
+                dynamic[key] = (
+                    plan.order,
+                    compile_path_regex(route.path, route.path_params),
+                    {},
+                )
+            # A later route with the same pattern and method is never reached
+            dynamic[key][2].setdefault(route.method, plan)
+
+        self.static: Mapping[str, PathEntry] = MappingProxyType(
+            {path: PathEntry.create(methods) for path, methods in static.items()}
+        )
+        self.dynamic: tuple[tuple[int, Pattern, PathEntry], ...] = tuple(
+            (order, pattern, PathEntry.create(methods))
+            for order, pattern, methods in dynamic.values()
+        )
+
+    def match(
+        self, method: str, path: str
+    ) -> tuple[Optional[RoutePlan], dict[str, str], Optional[str]]:
+        """Finds the route for a request.
+
+        Args:
+            method: The HTTP method of the request.
+            path: The path of the request.
+
+        Returns:
+            A tuple of the plan of the matching route, or None if there isn't
+            one, the path parameters, and the methods the path accepts if a
+            route matches the path but not the method.
+        """
+
+        method = method.lower()
+
+        entry = self.static.get(path)
+        if entry is not None:
+            plan = entry.plans.get(method)
+            return (plan, {}, None) if plan is not None else (None, {}, entry.allow)
+
+        best, best_match, allowed = None, None, set()
+
+        for order, pattern, entry in self.dynamic:
+            if best is not None and order > best.order:
+                break  # Every remaining route comes after the matching one
+
+            match = pattern.fullmatch(path)
+            if match is None:
+                continue
+
+            plan = entry.plans.get(method)
+            if plan is None:
+                allowed.update(entry.plans)
+            elif best is None or plan.order < best.order:
+                best, best_match = plan, match
+
+        if best is None:
+            allow = ", ".join(sorted(method.upper() for method in allowed))
+            return None, {}, allow or None
+
+        # Path parameters are matched by position, since routes which share
+        # a pattern can name their parameters differently
+        return best, dict(zip(best.route.path_params, best_match.groups())), None
@@ -2,14 +2,30 @@ import asyncio
 import inspect
 import re
 import functools
-from typing import Any, Optional, Pattern, Sequence, Callable
+from types import MappingProxyType
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncContextManager,
+    Callable,
+    Mapping,
+    Optional,
+    Pattern,
+    Sequence,
+    Union,
+)
 from urllib.parse import parse_qs
 
-from pydantic import ValidationError, parse_obj_as
-
-from arc.http import JSONResponse
+from arc.dependencies import DependencyGraph, compile_dependencies
+from arc.exceptions import ArcException
+from arc.http import JSONResponse, Request
+from arc.http.responses import encode_links, send_early_hints
+from arc.state import State
 from arc.types import CoroutineFunction, DCallable
 
+if TYPE_CHECKING:
+    from arc.routing.dispatch import DispatchTable
+
 METHODS = {
     "get",
     "post",
@@ -26,6 +42,8 @@ PATH_REGEX = re.compile(
     r"{([a-zA-Z_][a-zA-Z\d_]*)}"
 )  # The regex for matching path parameters in a url
 
+PARAM_REGEX = r"[a-zA-Z_0-9]+"  # The regex for matching the value of a path parameter
+
 
 def get_path_params(path: str) -> list[str]:
     """Gets the path parameters from a given path
@@ -49,7 +67,9 @@ def get_path_params(path: str) -> list[str]:
     return path_params
 
 
-def compile_path_regex(path: str, path_params: list[str], method: str) -> Pattern:
+def compile_path_regex(
+    path: str, path_params: list[str], method: Optional[str] = None
+) -> Pattern:
     """Compiles a regex that matches the given path
 
     Uses the path and path parameters provided to create
@@ -59,22 +79,39 @@ def compile_path_regex(path: str, path_params: list[str], method: str) -> Patter
         path: The path to generate the regex for.
         path_params: A list of the path parameters that the
           path contains.
-        method: An optional HTTP method that the route accepts
+        method: An optional HTTP method that the route accepts, which
+          the pattern is prefixed with.
 
     Returns:
         A regex pattern which matches the given path.
     """
 
-    pattern = f"{method}_{path}"
+    pattern = f"{method}_{path}" if method is not None else path
 
     for param in path_params:
         pattern = pattern.replace(
-            f"{{{param}}}", rf"(?P<{param}>[a-zA-Z_0-9]+)"
+            f"{{{param}}}", rf"(?P<{param}>{PARAM_REGEX})"
         )  # Replace the path parameter with a regex group for matching it
 
     return re.compile(pattern)
 
 
+def validation_error() -> type[Exception]:
+    """Gets pydantic's ValidationError.
+
+    pydantic is only imported once it's needed, so that routes without
+    typed parameters never import it. Can be used directly in an `except`
+    clause, which is only evaluated once an exception is raised.
+
+    Returns:
+        The ValidationError class from pydantic.
+    """
+
+    from pydantic import ValidationError
+
+    return ValidationError
+
+
 def parse_params(
     q_params: dict[str, Any],
     p_params: dict[str, Any],
@@ -103,12 +140,47 @@ def parse_params(
     # key in the original parameters dictionary, and `v` is the value to be casted.
     # The function fetches a type from `types` corresponding to the current key,
     # and if there isn't one, uses Any for casting, which effectively doesn't cast
+    from pydantic import parse_obj_as
+
     parsed_q = {k: parse_obj_as(types.get(k) or Any, v) for k, v in q_params.items()}
     parsed_p = {k: parse_obj_as(types.get(k) or Any, v) for k, v in p_params.items()}
 
     return parsed_q, parsed_p
 
 
+def coerce_params(
+    q_params: dict[str, Any],
+    p_params: dict[str, Any],
+    coercers: Mapping[str, Callable[[Any], Any]],
+) -> tuple[dict[str, Any], dict[str, Any]]:
+    """Casts query and path parameters using precompiled casting functions.
+
+    Args:
+        q_params: A dict containing query parameters and their
+          values.
+        p_params: A dict containing path parameters and their
+          values.
+        coercers: A mapping of parameter names to the functions which
+          cast them. Parameters without one are left as they are.
+
+    Returns:
+        A tuple of two dicts which contains the parsed query
+        and path parameters.
+
+    Raises:
+        ValidationError: Raises pydantic's ValidationError upon encountering an invalid value which
+          cannot be parsed.
+    """
+
+    if not coercers:
+        return q_params, p_params
+
+    parsed_q = {k: coercers[k](v) if k in coercers else v for k, v in q_params.items()}
+    parsed_p = {k: coercers[k](v) if k in coercers else v for k, v in p_params.items()}
+
+    return parsed_q, parsed_p
+
+
 class Route:
     """Represents a single route for an endpoint in an Arc application.
 
@@ -120,6 +192,9 @@ class Route:
         handler: A function that is used as a handler for the route.
         method: The HTTP method that the route should accept, defaults to
         `get`.
+        early_hints: The values of `Link` headers which are sent as 103
+          Early Hints before the handler is called, if the server supports
+          them.
 
     Attributes:
         path: The path for the route.
@@ -127,13 +202,39 @@ class Route:
         method: The HTTP method that the route should accept.
         path_params: A list of path parameters for the route.
         path_regex: A regex which matches the path for the route.
+        state_params: The names of the handler's parameters which are
+          annotated with `State`, and receive the application's state.
+        request_params: The names of the handler's parameters which are
+          annotated with `Request`, and receive the request.
+        handler_params: The names of the handler's parameters, or None if the
+          handler accepts arbitrary keyword arguments.
+        dependencies: The compiled dependency graph of the handler.
+        param_types: The declared types of the handler's path and query
+          parameters.
+        early_hints: The encoded `Link` header values of the route's early
+          hints.
     """
 
+    __slots__ = (
+        "path",
+        "handler",
+        "method",
+        "path_params",
+        "path_regex",
+        "handler_params",
+        "state_params",
+        "request_params",
+        "dependencies",
+        "param_types",
+        "early_hints",
+    )
+
     def __init__(
         self,
         path: str,
         handler: Callable,
         method: Optional[str] = "get",
+        early_hints: Optional[Sequence[Union[str, bytes]]] = None,
     ):
         if not inspect.iscoroutinefunction(handler):
             raise AttributeError("Handler must be an asynchronous function")
@@ -151,9 +252,40 @@ class Route:
             path
         )  # Get the path parameters for the url
         self.path_regex: Pattern = compile_path_regex(
-            path, self.path_params, method
+            path, self.path_params, self.method
         )  # Get the path regex used for matching on the URL
 
+        signature = inspect.signature(handler)
+        self.handler_params: Optional[set[str]] = (
+            None
+            if any(p.kind is p.VAR_KEYWORD for p in signature.parameters.values())
+            else set(signature.parameters)
+        )  # The names of the handler's parameters, or None if it accepts any keyword
+        self.state_params: list[str] = [
+            name
+            for name, param in signature.parameters.items()
+            if param.annotation is State
+        ]  # Parameters which receive the application's state
+        self.request_params: list[str] = [
+            name
+            for name, param in signature.parameters.items()
+            if param.annotation is Request
+        ]  # Parameters which receive the request
+        self.dependencies: DependencyGraph = compile_dependencies(
+            signature
+        )  # Compile the dependency graph once, rather than on every request
+        self.param_types: dict[str, Any] = {
+            name: param.annotation
+            for name, param in signature.parameters.items()
+            if param.annotation is not param.empty
+            and param.annotation is not State
+            and param.annotation is not Request
+            and name not in self.dependencies.handler_dependencies
+        }  # The types to cast path and query parameters to
+        self.early_hints: tuple[bytes, ...] = encode_links(
+            early_hints or ()
+        )  # Encode the links once, rather than on every request
+
     def __eq__(self, other: "Route") -> bool:
         return self.path == other.path and self.method == other.method
 
@@ -167,28 +299,55 @@ class Router:
     Args:
         app: An ASGI application.
         routes: A sequence of routes to create the Router with.
+        on_startup: A sequence of callables which are called when the
+          application starts up.
+        on_shutdown: A sequence of callables which are called when the
+          application shuts down.
+        lifespan: A callable which takes the application and returns an
+          async context manager. It is entered on startup and exited on
+          shutdown. If it yields a mapping, the mapping is added to the
+          application's state.
 
     Attributes:
         routes: The original routes that the Router uses.
         paths: The paths for each of the routes in the Router.
         app: an ASGI application.
+        on_startup: The callables which are called on startup.
+        on_shutdown: The callables which are called on shutdown.
+        lifespan_context: The lifespan context manager factory, if any.
+        dependency_cache: The tasks of app scoped dependencies, shared across
+          requests.
+        table: The precompiled dispatch table of the Router, which is set
+          once the Router is frozen.
     """
 
     def __init__(
-        self, app: CoroutineFunction, routes: Optional[Sequence[Route]] = None
+        self,
+        app: CoroutineFunction,
+        routes: Optional[Sequence[Route]] = None,
+        on_startup: Optional[Sequence[Callable]] = None,
+        on_shutdown: Optional[Sequence[Callable]] = None,
+        lifespan: Optional[Callable[[Any], AsyncContextManager]] = None,
     ):
-        # self.routes: list[Route] = list(routes) if routes is not None else []
-        self.routes: dict[str, Route] = (
-            {route.path_regex: route for route in routes} if routes is not None else {}
+        self.routes: Mapping[str, Route] = (
+            {f"{route.method}_{route.path}": route for route in routes}
+            if routes is not None
+            else {}
         )
 
         self.app = app
+        self.on_startup: Sequence[Callable] = list(on_startup or [])
+        self.on_shutdown: Sequence[Callable] = list(on_shutdown or [])
+        self.lifespan_context = lifespan
+        self.dependency_cache: dict[Any, Any] = {}
+        self.table: Optional["DispatchTable"] = None
 
     def register(
         self,
         path: str,
         handler: Callable,
         method: Optional[str] = None,
+        early_hints: Optional[Sequence[Union[str, bytes]]] = None,
     ):
         """Registers a route on to the Router.
 
@@ -196,18 +355,28 @@ class Router:
             path: The path for the route.
             handler: A function that is used as a handler for the route.
             method: The HTTP method that the route should accept.
+            early_hints: The values of `Link` headers which are sent as 103
+              Early Hints before the handler is called.
         """
 
+        if self.frozen:
+            raise AttributeError("Cannot register routes on a frozen router")
+
         if not inspect.iscoroutinefunction(handler):
             raise AttributeError("Handler must be an asynchronous function")
 
         if f"{method}_{path}" in self.routes:
             raise AttributeError(f"Duplicate routes not allowed")
 
-        route = Route(path, handler, method)
+        route = Route(path, handler, method, early_hints)
         self.routes[f"{method or ''}_{path}"] = route
 
-    def route(self, path: str, method: Optional[str]) -> DCallable:
+    def route(
+        self,
+        path: str,
+        method: Optional[str],
+        early_hints: Optional[Sequence[Union[str, bytes]]] = None,
+    ) -> DCallable:
         """A decorator used for adding new routes to the Router.
 
         A wrapper around the Router's `register` function that is used as a
@@ -216,23 +385,118 @@ class Router:
         Args:
             path: The path for the route.
             method: The HTTP method that the route should accept.
+            early_hints: The values of `Link` headers which are sent as 103
+              Early Hints before the handler is called.
 
         Returns:
             A decorated callable function.
         """
 
         def wrapper(handler: Callable):
-            self.register(path, handler, method)
+            self.register(path, handler, method, early_hints)
             return handler
 
         return wrapper
 
+    @property
+    def frozen(self) -> bool:
+        """Whether the Router has been frozen."""
+
+        return self.table is not None
+
+    def freeze(self):
+        """Compiles the routes of the Router into an immutable dispatch table.
+
+        Once frozen, requests are dispatched using the table, and routes and
+        lifespan handlers can no longer be added. Freezing an already frozen
+        Router does nothing.
+        """
+
+        if self.frozen:
+            return
+
+        from arc.routing.dispatch import DispatchTable
+
+        self.on_startup = tuple(self.on_startup)
+        self.on_shutdown = tuple(self.on_shutdown)
+        self.routes = MappingProxyType(self.routes)
+        self.table = DispatchTable(self.routes.values())
+
     def register_router(self, router: "Router"):
         ...
 
+    async def startup(self):
+        """Runs the startup handlers of the Router."""
+
+        for handler in self.on_startup:
+            result = handler()
+            if inspect.isawaitable(result):
+                await result
+
+    async def shutdown(self):
+        """Runs the shutdown handlers of the Router."""
+
+        for handler in self.on_shutdown:
+            result = handler()
+            if inspect.isawaitable(result):
+                await result
+
+    async def lifespan(
+        self, scope: dict, receive: CoroutineFunction, send: CoroutineFunction
+    ):
+        """Handles the ASGI lifespan protocol.
+
+        Runs the startup handlers and enters the lifespan context when the
+        server starts, and exits the lifespan context and runs the shutdown
+        handlers when the server stops.
+
+        Args:
+            scope: The ASGI scope of the lifespan connection.
+            receive: The ASGI receive callable.
+            send: The ASGI send callable.
+        """
+
+        context = None
+        await receive()  # lifespan.startup
+
+        try:
+            await self.startup()
+
+            if self.lifespan_context is not None:
+                context = self.lifespan_context(self.app)
+                values = await context.__aenter__()
+                if isinstance(values, Mapping):
+                    self.app.state.update(values)
+        except BaseException as e:
+            await send({"type": "lifespan.startup.failed", "message": repr(e)})
+            raise
+
+        await send({"type": "lifespan.startup.complete"})
+
+        message = await receive()
+        if message["type"] != "lifespan.shutdown":
+            raise RuntimeError(
+                f"Expected a lifespan.shutdown message, got {message['type']}"
+            )
+
+        try:
+            if context is not None:
+                await context.__aexit__(None, None, None)
+
+            await self.shutdown()
+        except BaseException as e:
+            await send({"type": "lifespan.shutdown.failed", "message": repr(e)})
+            raise
+
+        await send({"type": "lifespan.shutdown.complete"})
+
     async def __call__(
         self, scope: dict, receive: CoroutineFunction, send: CoroutineFunction
     ):
+        if scope["type"] == "lifespan":
+            await self.lifespan(scope, receive, send)
+            return
+
         if scope["type"] not in ("http", "websocket"):
             # Check whether the type of the request is HTTP or
             # websocket, and if not, return an error
@@ -248,61 +512,167 @@ class Router:
         if "router" not in scope:
             scope["router"] = self
 
+        coercers = None
+
+        if self.table is not None:
+            plan, path_params, allow = self.table.match(scope["method"], scope["path"])
+            if plan is not None:
+                route, coercers = plan.route, plan.coercers
+            else:
+                route = None
+        else:
+            route, path_params, allow = self.match(scope["method"], scope["path"])
+
+        if route is None:
+            if allow is not None:
+                response = JSONResponse(
+                    {"Error": "Method not allowed"},
+                    status_code=405,
+                    headers={"allow": allow},
+                )
+            else:
+                response = JSONResponse(
+                    {"Error": f"URL not found {scope['path']}"}, status_code=404
+                )
+
+            await response(scope, receive, send)
+            return
+
+        scope["route"] = route
+        await self.handle(route, path_params, coercers, scope, receive, send)
+
+    def match(
+        self, method: str, path: str
+    ) -> tuple[Optional[Route], dict[str, Any], Optional[str]]:
+        """Finds the route for a request.
+
+        Args:
+            method: The HTTP method of the request.
+            path: The path of the request.
+
+        Returns:
+            A tuple of the matching route, or None if there isn't one, the path
+            parameters, and the methods the path accepts if a route matches
+            the path but not the method.
+        """
+
+        method = method.lower()
+        allowed = set()
+
         for pattern, route in self.routes.items():
-            match = route.path_regex.match(scope["path"])
+            match = route.path_regex.fullmatch(f"{route.method}_{path}")
             if match:
-                if scope["method"].lower() != route.method:
-                    response = JSONResponse(
-                        {"Error": "Method not allowed"}, status_code=405
-                    )
-                    await response(scope, receive, send)
-                    return
-
-                path_params = match.groupdict()
-                query_params = {
-                    k.decode(): v[0] for k, v in parse_qs(scope["query_string"]).items()
-                }
-
-                if route.handler.__annotations__:
-                    # Only try to parse parameters if explicit types are declared
-                    try:
-                        query_params, path_params = parse_params(
-                            query_params, path_params, route.handler.__annotations__
-                        )
-                        print(query_params)
-                    except ValidationError as e:
-                        # If the type conversion failed, return an error response
-                        response = JSONResponse(
-                            {
-                                "Error": f"Bad request, failed to parse parameters: {e.errors()[0]['msg']}"
-                            },
-                            status_code=400,
-                        )
-                        await response(scope, receive, send)
-                        return
-
-                try:
-                    if inspect.iscoroutinefunction(route.handler):
-                        response = await route.handler(
-                            *path_params.values(), **query_params
-                        )
-                    else:
-                        loop = asyncio.get_event_loop()
-                        handler = functools.partial(route.handler, **query_params)
-
-                        response = await loop.run_in_executor(
-                            None, handler, *path_params.values()
-                        )
-                except ValidationError as e:
-                    response = JSONResponse(
-                        {"Error": f"Missing required query parameter {str(e)[47:-1]}"},
-                        status_code=422,
-                    )
+                if method != route.method:
+                    # The path matches, but another route may still accept the method
+                    allowed.add(route.method.upper())
+                    continue
+
+                return route, match.groupdict(), None
+
+        return None, {}, ", ".join(sorted(allowed)) if allowed else None
 
-                await response(scope, receive, send)
-                return
+    async def handle(
+        self,
+        route: Route,
+        path_params: dict[str, Any],
+        coercers: Optional[Mapping[str, Callable[[Any], Any]]],
+        scope: dict,
+        receive: CoroutineFunction,
+        send: CoroutineFunction,
+    ):
+        """Calls the handler of a route, and sends its response.
 
-        response = JSONResponse(
-            {"Error": f"URL not found {scope['path']}"}, status_code=404
+        Args:
+            route: The route which matched the request.
+            path_params: The raw path parameters of the request.
+            coercers: The precompiled casting functions of the route, if the
+              Router is frozen. Otherwise, parameters are cast with
+              `parse_params`.
+            scope: The ASGI scope of the request.
+            receive: The ASGI receive callable.
+            send: The ASGI send callable.
+        """
+
+        query_string = scope["query_string"]
+        query_params = (
+            {k: v[0] for k, v in parse_qs(query_string.decode("latin-1")).items()}
+            if query_string
+            else {}
         )
+
+        try:
+            if coercers is not None:
+                query_params, path_params = coerce_params(
+                    query_params, path_params, coercers
+                )
+            elif route.param_types:
+                # Only try to parse parameters if explicit types are declared
+                query_params, path_params = parse_params(
+                    query_params, path_params, route.param_types
+                )
+        except validation_error() as e:
+            # If the type conversion failed, return an error response
+            response = JSONResponse(
+                {
+                    "Error": f"Bad request, failed to parse parameters: {e.errors()[0]['msg']}"
+                },
+                status_code=400,
+            )
+            await response(scope, receive, send)
+            return
+
+        if route.dependencies:
+            params = {**query_params, **path_params}
+
+        if query_params and route.handler_params is not None:
+            # Query parameters the handler doesn't accept may still be used
+            # by its dependencies, so they're only dropped here
+            query_params = {
+                k: v for k, v in query_params.items() if k in route.handler_params
+            }
+
+        for name in route.state_params:
+            query_params[name] = self.app.state
+
+        if route.early_hints:
+            # Let the client start fetching resources while the handler runs
+            await send_early_hints(scope, send, route.early_hints)
+
+        request = None
+        if route.request_params or route.dependencies.needs_request:
+            request = Request(scope, receive, send)
+            for name in route.request_params:
+                query_params[name] = request
+
+        try:
+            if route.dependencies:
+                query_params.update(
+                    await route.dependencies.resolve(
+                        self.app.state, request, params, self.dependency_cache
+                    )
+                )
+
+            if inspect.iscoroutinefunction(route.handler):
+                response = await route.handler(*path_params.values(), **query_params)
+            else:
+                loop = asyncio.get_event_loop()
+                handler = functools.partial(route.handler, **query_params)
+
+                response = await loop.run_in_executor(
+                    None, handler, *path_params.values()
+                )
+        except validation_error() as e:
+            response = JSONResponse(
+                {"Error": f"Missing required query parameter {str(e)[47:-1]}"},
+                status_code=422,
+            )
+        except ArcException as e:
+            # Raised by the handler, its dependencies or the request, such as
+            # when a form is too large. Exceptions without a status code are
+            # treated as internal errors
+            response = JSONResponse(
+                {"Error": str(e.message or e)},
+                status_code=getattr(e, "status_code", 500),
+            )
+
         await response(scope, receive, send)
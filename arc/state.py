@@ -0,0 +1,52 @@
+from typing import Any, Iterator, Mapping, Optional
+
+
+class State:
+    """Container for application-wide state
+
+    Holds objects which live for the lifetime of the application, such as
+    database or HTTP client pools. Values are accessed as attributes. Route
+    handlers can receive the application's state by annotating a parameter
+    with `State`.
+
+    Args:
+        values: An optional mapping of initial values for the state.
+    """
+
+    def __init__(self, values: Optional[Mapping[str, Any]] = None):
+        super().__setattr__("_values", dict(values) if values is not None else {})
+
+    def __getattr__(self, key: str) -> Any:
+        try:
+            return self._values[key]
+        except KeyError:
+            raise AttributeError(f"State has no attribute {key!r}") from None
+
+    def __setattr__(self, key: str, value: Any):
+        self._values[key] = value
+
+    def __delattr__(self, key: str):
+        try:
+            del self._values[key]
+        except KeyError:
+            raise AttributeError(f"State has no attribute {key!r}") from None
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._values
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._values)
+
+    def update(self, values: Mapping[str, Any]):
+        """Updates the state with the values from a mapping.
+
+        Args:
+            values: A mapping of names to values.
+        """
+
+        self._values.update(values)
+
+    def clear(self):
+        """Removes every value from the state."""
+
+        self._values.clear()
@@ -0,0 +1,476 @@
+import asyncio
+import cProfile
+import collections
+import importlib
+import pstats
+import sys
+import threading
+import time
+from typing import Any, Iterable, Mapping, NamedTuple, Optional, Union
+
+import orjson
+
+from arc.types import CoroutineFunction
+
+
+class TraceRequest(NamedTuple):
+    """A single request in a trace
+
+    Attributes:
+        method: The HTTP method of the request.
+        path: The path of the request.
+        query_string: The raw query string of the request.
+        headers: The raw headers of the request.
+        body: The body of the request.
+    """
+
+    method: str = "GET"
+    path: str = "/"
+    query_string: bytes = b""
+    headers: tuple[tuple[bytes, bytes], ...] = ()
+    body: bytes = b""
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "TraceRequest":
+        headers = data.get("headers") or {}
+        return cls(
+            data.get("method", "GET").upper(),
+            data.get("path", "/"),
+            data.get("query_string", "").encode("latin-1"),
+            tuple(
+                (key.lower().encode("latin-1"), value.encode("latin-1"))
+                for key, value in headers.items()
+            ),
+            data.get("body", "").encode("utf-8"),
+        )
+
+
+def load_trace(path: str) -> list[TraceRequest]:
+    """Loads a trace of requests from a JSON lines file.
+
+    Every line of the file is a request, such as:
+
+        {"method": "GET", "path": "/items/1", "query_string": "verbose=true"}
+
+    with optional `headers` (an object) and `body` (a string) keys.
+
+    Args:
+        path: The path of the trace file.
+
+    Returns:
+        A list of the requests in the trace.
+    """
+
+    with open(path, "rb") as f:
+        return [
+            TraceRequest.from_dict(orjson.loads(line)) for line in f if line.strip()
+        ]
+
+
+class TestResponse(NamedTuple):
+    """A response received from the application
+
+    Attributes:
+        status_code: The status code of the response.
+        headers: The raw headers of the response.
+        body: The body of the response.
+        messages: Every ASGI message sent by the application.
+    """
+
+    status_code: int
+    headers: list[tuple[bytes, bytes]]
+    body: bytes
+    messages: list[dict]
+
+    __test__ = False  # Stop pytest from collecting the class
+
+    @property
+    def text(self) -> str:
+        return self.body.decode("utf-8")
+
+    def json(self) -> Any:
+        return orjson.loads(self.body)
+
+
+class ASGIDriver:
+    """Sends requests straight to an ASGI application
+
+    Builds the ASGI scope and messages for every request, and collects the
+    messages which the application sends back, without any networking or
+    HTTP parsing in between.
+
+    Args:
+        app: The ASGI application to drive.
+        extensions: The ASGI extensions to advertise in every scope.
+
+    Attributes:
+        app: The ASGI application.
+        extensions: The ASGI extensions advertised in every scope.
+    """
+
+    def __init__(
+        self, app: CoroutineFunction, extensions: Optional[dict[str, dict]] = None
+    ):
+        self.app = app
+        self.extensions = extensions if extensions is not None else {}
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        *,
+        query_string: Union[str, bytes] = b"",
+        headers: Iterable[tuple[bytes, bytes]] = (),
+        body: bytes = b"",
+    ) -> TestResponse:
+        """Sends a request to the application.
+
+        Args:
+            method: The HTTP method of the request.
+            path: The path of the request.
+            query_string: The query string of the request.
+            headers: The raw headers of the request.
+            body: The body of the request.
+
+        Returns:
+            The response of the application.
+        """
+
+        if isinstance(query_string, str):
+            query_string = query_string.encode("latin-1")
+
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method.upper(),
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode("latin-1"),
+            "query_string": query_string,
+            "headers": list(headers),
+            "client": ("127.0.0.1", 50000),
+            "server": ("127.0.0.1", 5000),
+            "extensions": self.extensions,
+        }
+
+        received = False
+        messages = []
+
+        async def receive() -> dict:
+            nonlocal received
+            if not received:
+                received = True
+                return {"type": "http.request", "body": body, "more_body": False}
+
+            return {"type": "http.disconnect"}
+
+        async def send(message: dict):
+            messages.append(message)
+
+        await self.app(scope, receive, send)
+
+        status_code, response_headers, chunks = 500, [], []
+        for message in messages:
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                response_headers = message.get("headers", [])
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        return TestResponse(status_code, response_headers, b"".join(chunks), messages)
+
+    async def get(self, path: str, **kwargs) -> TestResponse:
+        return await self.request("GET", path, **kwargs)
+
+    async def post(self, path: str, **kwargs) -> TestResponse:
+        return await self.request("POST", path, **kwargs)
+
+    async def replay(self, request: TraceRequest) -> TestResponse:
+        """Sends a request from a trace to the application."""
+
+        return await self.request(
+            request.method,
+            request.path,
+            query_string=request.query_string,
+            headers=request.headers,
+            body=request.body,
+        )
+
+
+class SamplingProfiler:
+    """A statistical profiler which samples the stack of a thread
+
+    Runs in a background thread, and records the call stack of the profiled
+    thread at a fixed interval. Unlike `cProfile`, it doesn't slow down the
+    profiled code, at the cost of only being approximate.
+
+    Args:
+        interval: The time between samples in seconds.
+        thread_id: The identifier of the thread to profile, defaults to the
+          current thread.
+
+    Attributes:
+        samples: A counter of the sampled stacks. Every stack is a tuple of
+          `file:function` strings, from the outermost frame inwards.
+    """
+
+    def __init__(
+        self, interval: Optional[float] = 0.001, thread_id: Optional[int] = None
+    ):
+        self.interval = interval
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.samples: collections.Counter = collections.Counter()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_filename}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.samples[tuple(reversed(stack))] += 1
+
+    def start(self):
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def collapsed(self) -> str:
+        """Formats the samples as collapsed stacks, as used by flame graph tools.
+
+        Returns:
+            A line for every sampled stack, with its frames separated by `;`
+            and followed by the number of times it was sampled.
+        """
+
+        return "\n".join(
+            f"{';'.join(stack)} {count}" for stack, count in self.samples.most_common()
+        )
+
+
+class LoadReport:
+    """The results of replaying a trace against an application
+
+    Args:
+        latencies: The latency of every request in seconds.
+        statuses: A counter of the status codes of the responses.
+        errors: The number of requests which raised an exception.
+        duration: The total duration of the replay in seconds.
+        profile: The profile of the replay, if any.
+
+    Attributes:
+        latencies: The sorted latencies of every request in seconds.
+        statuses: A counter of the status codes of the responses.
+        errors: The number of requests which raised an exception.
+        duration: The total duration of the replay in seconds.
+        profile: Either `pstats.Stats` or a `SamplingProfiler`, depending on
+          the profiler which was used, or None.
+    """
+
+    def __init__(
+        self,
+        latencies: list[float],
+        statuses: collections.Counter,
+        errors: int,
+        duration: float,
+        profile: Optional[Union[pstats.Stats, SamplingProfiler]] = None,
+    ):
+        self.latencies = sorted(latencies)
+        self.statuses = statuses
+        self.errors = errors
+        self.duration = duration
+        self.profile = profile
+
+    @property
+    def throughput(self) -> float:
+        """The number of requests completed per second."""
+
+        return len(self.latencies) / self.duration if self.duration else 0.0
+
+    def percentile(self, percent: float) -> float:
+        """Gets a latency percentile, using the nearest-rank method.
+
+        Args:
+            percent: The percentile to get, between 0 and 100.
+
+        Returns:
+            The latency in seconds.
+        """
+
+        if not self.latencies:
+            return 0.0
+
+        rank = max(int(-(-percent * len(self.latencies) // 100)), 1)
+        return self.latencies[min(rank, len(self.latencies)) - 1]
+
+    def __str__(self) -> str:
+        percentiles = ", ".join(
+            f"p{percent:g} {self.percentile(percent) * 1000:.3f} ms"
+            for percent in (50, 90, 99, 99.9)
+        )
+        statuses = ", ".join(
+            f"{status}: {count}" for status, count in sorted(self.statuses.items())
+        )
+        return (
+            f"{len(self.latencies)} requests in {self.duration:.3f} s "
+            f"({self.throughput:.0f} req/s)\n"
+            f"latency: {percentiles}, max {self.latencies[-1] * 1000:.3f} ms\n"
+            f"statuses: {statuses}, errors: {self.errors}"
+            if self.latencies
+            else "0 requests"
+        )
+
+
+async def replay(
+    app: CoroutineFunction,
+    trace: Iterable[TraceRequest],
+    *,
+    rate: Optional[float] = None,
+    concurrency: Optional[int] = 100,
+    repeat: Optional[int] = 1,
+    profiler: Optional[str] = None,
+    extensions: Optional[dict[str, dict]] = None,
+) -> LoadReport:
+    """Replays a trace of requests against an application.
+
+    With a rate, requests are started on a fixed schedule regardless of how
+    long earlier requests take, and their latency is measured from the time
+    they were scheduled to start, so that a slow application can't hide its
+    own queueing delay. Without a rate, requests are sent as fast as the
+    application handles them.
+
+    Args:
+        app: The ASGI application.
+        trace: The requests to replay.
+        rate: The number of requests to start per second, or None to send
+          them as fast as possible.
+        concurrency: The maximum number of requests in flight at once.
+        repeat: The number of times to replay the trace.
+        profiler: Either `cprofile` or `sampling` to profile the replay, or
+          None.
+        extensions: The ASGI extensions to advertise in every scope.
+
+    Returns:
+        The results of the replay.
+    """
+
+    if profiler not in (None, "cprofile", "sampling"):
+        raise AttributeError(
+            f"Invalid profiler {profiler}, has to be one of cprofile or sampling"
+        )
+
+    driver = ASGIDriver(app, extensions)
+    requests = list(trace) * repeat
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    statuses: collections.Counter = collections.Counter()
+    errors = 0
+    clock = time.perf_counter
+
+    async def run(request: TraceRequest, scheduled: Optional[float] = None):
+        nonlocal errors
+        async with semaphore:
+            if scheduled is None:
+                scheduled = clock()  # Without a rate, only time the request itself
+
+            try:
+                response = await driver.replay(request)
+                statuses[response.status_code] += 1
+            except Exception:
+                errors += 1
+            latencies.append(clock() - scheduled)
+
+    profile = None
+    if profiler == "cprofile":
+        profile = cProfile.Profile()
+        profile.enable()
+    elif profiler == "sampling":
+        profile = SamplingProfiler()
+        profile.start()
+
+    start = clock()
+    try:
+        if rate is None:
+            await asyncio.gather(*(run(request) for request in requests))
+        else:
+            tasks = []
+            for i, request in enumerate(requests):
+                scheduled = start + i / rate
+                delay = scheduled - clock()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                tasks.append(asyncio.ensure_future(run(request, scheduled)))
+            await asyncio.gather(*tasks)
+    finally:
+        duration = clock() - start
+        if profiler == "cprofile":
+            profile.disable()
+            profile = pstats.Stats(profile)
+        elif profiler == "sampling":
+            profile.stop()
+
+    return LoadReport(latencies, statuses, errors, duration, profile)
+
+
+def main(argv: Optional[list[str]] = None):
+    """Replays a trace against an application from the command line.
+
+    Usage:
+        python -m arc.testing module:app trace.jsonl [--rate N] [--profile P]
+    """
+
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="python -m arc.testing",
+        description="Replays a trace of requests against an Arc application",
+    )
+    parser.add_argument("app", help="the application to load, as module:attribute")
+    parser.add_argument("trace", help="a JSON lines file of requests")
+    parser.add_argument("--rate", type=float, help="requests to start per second")
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--profile", choices=("cprofile", "sampling"))
+    parser.add_argument("--output", help="where to write the profile")
+    args = parser.parse_args(argv)
+
+    module, _, attribute = args.app.partition(":")
+    app = getattr(importlib.import_module(module), attribute or "app")
+
+    report = asyncio.run(
+        replay(
+            app,
+            load_trace(args.trace),
+            rate=args.rate,
+            concurrency=args.concurrency,
+            repeat=args.repeat,
+            profiler=args.profile,
+        )
+    )
+    print(report)
+
+    if isinstance(report.profile, pstats.Stats):
+        if args.output:
+            report.profile.dump_stats(args.output)
+        else:
+            report.profile.sort_stats("cumulative").print_stats(20)
+    elif isinstance(report.profile, SamplingProfiler):
+        if args.output:
+            with open(args.output, "w") as f:
+                f.write(report.profile.collapsed())
+        else:
+            print(report.profile.collapsed())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""A small application for profiling the hot path of Arc
+
+Usage:
+    python -m arc.testing benchmarks.app:app benchmarks/trace.jsonl --repeat 1000
+"""
+
+from arc import Arc, Depends, State
+from arc.http import HTMLResponse, HTTPResponse, JSONResponse
+from arc.routing import Route
+
+
+async def index():
+    return HTMLResponse("<h1>Arc</h1>")
+
+
+async def get_user(token: str = "anonymous"):
+    return {"name": token}
+
+
+async def item(item_id: int, verbose: bool = False, user=Depends(get_user)):
+    return JSONResponse({"id": item_id, "verbose": verbose, "user": user["name"]})
+
+
+async def counter(state: State):
+    state.hits = getattr(state, "hits", 0) + 1
+    return HTTPResponse(f"{state.hits}")
+
+
+app = Arc(
+    routes=[
+        Route("/", index),
+        Route("/items/{item_id}", item),
+        Route("/counter", counter, "post"),
+    ]
+)
+app.freeze()
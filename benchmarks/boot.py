@@ -0,0 +1,124 @@
+"""Measures worker boot time and memory, with and without a frozen route table
+
+Forks a number of workers, in the way a pre-fork server does, and reports how
+long each worker takes to become ready, along with its RSS and the part of it
+which is private to the worker, rather than shared with the parent.
+
+In `build` mode every worker builds the application itself after forking. In
+`inherited` mode the parent builds the application, and the workers inherit
+it without it being frozen. In `frozen` mode the parent builds and freezes the
+application, and the workers inherit it. The difference between `inherited`
+and `frozen` is what freezing itself gains.
+
+Usage:
+    python -m benchmarks.boot [--routes N] [--workers N]
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+from arc import Arc
+from arc.http import HTTPResponse
+from arc.routing import Route
+
+
+async def handler(item_id: int, verbose: bool = False):
+    return HTTPResponse(f"{item_id} {verbose}")
+
+
+def build_app(routes: int) -> Arc:
+    return Arc(
+        routes=[Route(f"/resource{i}/{{item_id}}", handler) for i in range(routes)]
+    )
+
+
+def serve(app: Arc, routes: int):
+    """Sends a request to a handful of routes, so their code paths are warm"""
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict):
+        pass
+
+    async def run():
+        for i in range(0, routes, max(routes // 10, 1)):
+            scope = {
+                "type": "http",
+                "method": "GET",
+                "path": f"/resource{i}/1",
+                "query_string": b"verbose=true",
+            }
+            await app(scope, receive, send)
+
+    asyncio.run(run())
+
+
+def memory() -> tuple[int, int]:
+    """Gets the RSS and the private memory of the current process, in kB"""
+
+    values = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                values[parts[0].rstrip(":")] = int(parts[1])
+
+    return values["Rss"], values["Private_Clean"] + values["Private_Dirty"]
+
+
+def run(mode: str, routes: int, workers: int) -> list[tuple[float, int, int]]:
+    app = None
+    if mode in ("inherited", "frozen"):
+        app = build_app(routes)
+    if mode == "frozen":
+        app.freeze(gc_freeze=True)  # The parent is about to fork
+
+    results = []
+    for _ in range(workers):
+        read, write = os.pipe()
+        start = time.perf_counter()
+        pid = os.fork()
+
+        if pid == 0:
+            os.close(read)
+            worker_app = app if app is not None else build_app(routes)
+            serve(worker_app, routes)
+            boot = time.perf_counter() - start
+            rss, private = memory()
+            os.write(write, f"{boot} {rss} {private}".encode())
+            os._exit(0)
+
+        os.close(write)
+        with os.fdopen(read) as f:
+            boot, rss, private = f.read().split()
+        os.waitpid(pid, 0)
+        results.append((float(boot), int(rss), int(private)))
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--routes", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    # Load everything the workers use, so both modes start from the same imports
+    serve(build_app(1), 1)
+
+    for mode in ("build", "inherited", "frozen"):
+        results = run(mode, args.routes, args.workers)
+        boot = sum(r[0] for r in results) / len(results) * 1000
+        rss = sum(r[1] for r in results) / len(results) / 1024
+        private = sum(r[2] for r in results) / len(results) / 1024
+        print(
+            f"{mode:>9}: boot {boot:8.2f} ms, "
+            f"rss {rss:6.1f} MB, private {private:6.1f} MB per worker"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Measures the throughput and peak memory of parsing uploaded forms
+
+Streams a multipart body containing a single file of the given size through
+`Request.form()`, in chunks of the given size, without ever holding the whole
+body in memory. Reports the throughput of the parser, the peak RSS of the
+process, which should stay flat regardless of the size of the upload since
+files are spooled to disk, and the longest time the event loop was blocked
+for, measured by a task which wakes up every millisecond.
+
+Usage:
+    python -m benchmarks.forms [--size MB] [--chunk KB]
+"""
+
+import argparse
+import asyncio
+import resource
+import time
+
+from arc.http import Request
+
+BOUNDARY = b"----arcbenchmark"
+
+
+def chunks(size: int, chunk_size: int):
+    """Yields the chunks of a multipart body with a file of the given size"""
+
+    yield (
+        b"--" + BOUNDARY + b"\r\n"
+        b'Content-Disposition: form-data; name="upload"; filename="upload.bin"\r\n'
+        b"Content-Type: application/octet-stream\r\n\r\n"
+    )
+
+    # Contains parts of the delimiter, so the parser can't skip over it
+    chunk = (b"\r\n--" + b"x" * 1021) * (chunk_size // 1024)
+    sent = 0
+    while sent < size:
+        data = chunk[: size - sent]
+        sent += len(data)
+        yield data
+
+    yield b"\r\n--" + BOUNDARY + b"--\r\n"
+
+
+async def upload(size: int, chunk_size: int) -> tuple[float, float]:
+    body = chunks(size, chunk_size)
+
+    async def receive():
+        data = next(body, None)
+        return {
+            "type": "http.request",
+            "body": data or b"",
+            "more_body": data is not None,
+        }
+
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/",
+        "headers": [
+            (b"content-type", b"multipart/form-data; boundary=" + BOUNDARY),
+        ],
+    }
+    request = Request(scope, receive, None)
+
+    max_stall, woken = 0.0, time.perf_counter()
+
+    async def monitor():
+        nonlocal max_stall, woken
+        while True:
+            await asyncio.sleep(0.001)
+            now = time.perf_counter()
+            max_stall = max(max_stall, now - woken - 0.001)
+            woken = now
+
+    monitor_task = asyncio.ensure_future(monitor())
+    await asyncio.sleep(0)
+
+    start = time.perf_counter()
+    form = await request.form()
+    elapsed = time.perf_counter() - start
+
+    monitor_task.cancel()
+    max_stall = max(max_stall, time.perf_counter() - woken - 0.001)
+    assert form["upload"].size == size
+    await form.close()
+
+    return elapsed, max_stall
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=1024, help="upload size in MB")
+    parser.add_argument("--chunk", type=int, default=64, help="chunk size in KB")
+    args = parser.parse_args()
+
+    size = args.size * 1024 * 1024
+    elapsed, max_stall = asyncio.run(upload(size, args.chunk * 1024))
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    print(
+        f"{args.size} MB in {args.chunk} KB chunks: {elapsed:.2f} s, "
+        f"{args.size / elapsed:.0f} MB/s, peak rss {peak:.1f} MB, "
+        f"longest loop stall {max_stall * 1000:.1f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+import gc
+import io
+import weakref
+
+import orjson
+import pytest
+
+from arc import Arc
+from arc.http.responses import HTTPResponse
+from arc.middleware import AccessLogMiddleware
+from arc.middleware.accesslog import RingBuffer
+from arc.routing import Route
+from arc.testing import ASGIDriver
+
+
+@pytest.fixture
+def anyio_backend():
+    # The log is flushed on shutdown in the event loop's executor
+    return "asyncio"
+
+
+async def item(item_id: int):
+    return HTTPResponse(f"item {item_id}")
+
+
+def create_app(sink: io.BytesIO, **kwargs) -> Arc:
+    return Arc(
+        routes=[Route("/items/{item_id}", item)],
+        middleware=[(AccessLogMiddleware, {"sink": sink, **kwargs})],
+    )
+
+
+def read_log(sink: io.BytesIO) -> list[dict]:
+    return [orjson.loads(line) for line in sink.getvalue().splitlines()]
+
+
+@pytest.mark.anyio
+async def test_access_log():
+    sink = io.BytesIO()
+    app = create_app(sink)
+    driver = ASGIDriver(app)
+
+    await driver.get("/items/1")
+    await driver.get("/missing")
+    app.middleware.close()
+
+    first, second = read_log(sink)
+
+    assert first["method"] == "GET"
+    assert first["path"] == "/items/1"
+    assert first["route"] == "/items/{item_id}"
+    assert first["status"] == 200
+    assert first["bytes"] == len(b"item 1")
+    assert first["duration_ms"] >= first["ttfb_ms"] >= 0
+
+    assert second["route"] is None
+    assert second["status"] == 404
+    assert app.middleware.logged == 2
+
+
+@pytest.mark.anyio
+async def test_access_log_sampling():
+    sink = io.BytesIO()
+    app = create_app(sink, sample_rates={2: 0.0})
+    driver = ASGIDriver(app)
+
+    for _ in range(5):
+        await driver.get("/items/1")
+    await driver.get("/missing")
+    app.middleware.close()
+
+    assert [record["status"] for record in read_log(sink)] == [404]
+    assert app.middleware.sampled_out == 5
+
+
+@pytest.mark.anyio
+async def test_access_log_flushed_on_shutdown():
+    sink = io.BytesIO()
+    app = create_app(sink, flush_interval=60)
+    messages = iter([{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}])
+
+    async def receive():
+        await ASGIDriver(app).get("/items/1")  # Log a request while running
+        return next(messages)
+
+    async def send(message: dict):
+        pass
+
+    await app({"type": "lifespan"}, receive, send)
+
+    assert len(read_log(sink)) == 2
+
+
+@pytest.mark.anyio
+async def test_access_log_restarts_after_close():
+    sink = io.BytesIO()
+    app = create_app(sink)
+    driver = ASGIDriver(app)
+
+    await driver.get("/items/1")
+    app.middleware.close()
+    await driver.get("/items/2")
+    app.middleware.close()
+
+    assert [record["path"] for record in read_log(sink)] == ["/items/1", "/items/2"]
+
+
+def test_access_log_garbage_collected():
+    middleware = AccessLogMiddleware(None, sink=io.BytesIO())
+    ref = weakref.ref(middleware)
+
+    del middleware
+    gc.collect()
+
+    assert ref() is None
+
+
+def test_ring_buffer_drops_when_full():
+    buffer = RingBuffer(2)
+
+    assert buffer.put((1,))
+    assert buffer.put((2,))
+    assert not buffer.put((3,))
+    assert buffer.dropped == 1
+
+    assert buffer.drain(1) == [(1,)]
+    assert buffer.put((4,))
+    assert buffer.drain(10) == [(2,), (4,)]
+    assert len(buffer) == 0
+
+
+def test_invalid_sample_rates():
+    with pytest.raises(AttributeError):
+        AccessLogMiddleware(None, sample_rates={6: 0.5})
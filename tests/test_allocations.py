@@ -0,0 +1,106 @@
+import tracemalloc
+
+from arc import Arc
+from arc.http.responses import HTTPResponse
+from arc.routing import Route
+
+# tracemalloc only sees memory blocks which are still alive, so rather than
+# counting every allocation, the request is measured by the blocks it holds
+# when its response body is sent, when most of them are alive, and by
+# its peak memory, which also covers blocks freed before then.
+#
+# Measured on CPython 3.9 to 3.13, a simple GET request holds 10 to 15 blocks
+# and peaks at 1.2 to 2.5kB. The limits leave at least a third of headroom over
+# the highest measurement, since the numbers vary between versions.
+
+# The maximum number of memory blocks which a simple GET request may have
+# allocated, and not yet freed, by the time its response body is sent
+MAX_LIVE_BLOCKS = 20
+
+# The maximum amount of memory, in bytes, which a simple GET request may
+# allocate on top of what's already allocated
+MAX_PEAK_MEMORY = 3584
+
+
+async def handler():
+    return HTTPResponse("Hello, World")
+
+
+async def receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+def measure(app: Arc) -> tuple[int, int]:
+    """Measures the memory held by a single GET request through Arc.__call__
+
+    The request is driven without an event loop, so that only the allocations
+    made by the request itself are traced.
+
+    Returns:
+        The number of blocks allocated by the request which are still alive
+        when the response body is sent, and the peak memory used by the
+        request in bytes.
+    """
+
+    snapshots = []
+
+    async def send(message: dict):
+        if message["type"] == "http.response.body" and tracemalloc.is_tracing():
+            snapshots.append(tracemalloc.take_snapshot())
+
+    def request():
+        scope = {
+            "type": "http",
+            "method": "GET",
+            "path": "/",
+            "query_string": b"",
+            "headers": [(b"host", b"127.0.0.1:5000")],
+        }
+        coroutine = app(scope, receive, send)
+        try:
+            coroutine.send(None)
+        except StopIteration:
+            pass
+
+    request()  # Warm up caches and lazy imports
+
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+
+        request()
+
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    ignore = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    statistics = (
+        snapshots[-1]
+        .filter_traces(ignore)
+        .compare_to(before.filter_traces(ignore), "lineno")
+    )
+    live = sum(stat.count_diff for stat in statistics if stat.count_diff > 0)
+
+    return live, peak - current
+
+
+def test_memory_per_request():
+    app = Arc(routes=[Route("/", handler)])
+
+    live, peak = measure(app)
+
+    assert live <= MAX_LIVE_BLOCKS
+    assert peak <= MAX_PEAK_MEMORY
+
+
+def test_memory_per_request_frozen():
+    app = Arc(routes=[Route("/", handler)])
+    app.freeze()
+
+    live, peak = measure(app)
+
+    assert live <= MAX_LIVE_BLOCKS
+    assert peak <= MAX_PEAK_MEMORY
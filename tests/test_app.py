@@ -2,6 +2,7 @@ import pytest
 from httpx import AsyncClient
 
 from arc import Arc
+from arc.exceptions import ArcException, PageNotFound
 from arc.http.responses import HTTPResponse
 from arc.routing import Route
 
@@ -54,3 +55,40 @@ async def test_query_params():
 
     assert response.status_code == 200
     assert response.text == "10"
+
+
+@pytest.mark.anyio
+async def test_str_query_params():
+    async def handler(name: str = None, other=None):
+        return HTTPResponse(f"{type(name).__name__} {type(other).__name__}")
+
+    routes = [Route("/foo", handler)]
+    app = Arc(routes=routes)
+    app.freeze()
+
+    async with AsyncClient(app=app, base_url="http://127.0.0.1:5000/") as ac:
+        response = await ac.get("/foo?name=bar&other=baz")
+
+    assert response.status_code == 200
+    assert response.text == "str str"
+
+
+@pytest.mark.anyio
+async def test_arc_exceptions():
+    async def not_found():
+        raise PageNotFound("No such page")
+
+    async def error():
+        raise ArcException("boom")
+
+    routes = [Route("/missing", not_found), Route("/error", error)]
+    app = Arc(routes=routes)
+
+    async with AsyncClient(app=app, base_url="http://127.0.0.1:5000/") as ac:
+        response = await ac.get("/missing")
+        assert response.status_code == 404
+        assert response.json() == {"Error": "No such page"}
+
+        response = await ac.get("/error")
+        assert response.status_code == 500
+        assert response.json() == {"Error": "boom"}
@@ -0,0 +1,268 @@
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+
+from arc import Arc, Depends, State
+from arc.http.responses import HTTPResponse
+from arc.routing import Route
+
+
+@pytest.fixture
+def anyio_backend():
+    # Independent dependencies are resolved with asyncio.gather
+    return "asyncio"
+
+
+async def request(app: Arc, path: str):
+    async with AsyncClient(app=app, base_url="http://127.0.0.1:5000/") as ac:
+        return await ac.get(path)
+
+
+@pytest.mark.anyio
+async def test_dependency_injected():
+    async def get_user(token: str = "anonymous"):
+        return token
+
+    async def handler(user: str = Depends(get_user)):
+        return HTTPResponse(user)
+
+    app = Arc(routes=[Route("/", handler)])
+
+    assert (await request(app, "/")).text == "anonymous"
+    assert (await request(app, "/?token=alice")).text == "alice"
+
+
+@pytest.mark.anyio
+async def test_dependency_params_cast():
+    async def get_item(item_id: int, verbose: bool = False):
+        return f"{item_id + 1} {verbose}"
+
+    async def handler(item_id, item: str = Depends(get_item)):
+        return HTTPResponse(item)
+
+    app = Arc(routes=[Route("/items/{item_id}", handler)])
+
+    assert (await request(app, "/items/3?verbose=true")).text == "4 True"
+    assert (await request(app, "/items/three")).status_code == 400
+
+
+@pytest.mark.anyio
+async def test_dependency_memoized_per_request():
+    calls = []
+
+    def get_session():
+        calls.append("session")
+        return object()
+
+    async def get_user(session=Depends(get_session)):
+        return session
+
+    async def handler(session=Depends(get_session), user=Depends(get_user)):
+        return HTTPResponse(f"{session is user}")
+
+    app = Arc(routes=[Route("/", handler)])
+
+    assert (await request(app, "/")).text == "True"
+    assert (await request(app, "/")).text == "True"
+    assert calls == ["session", "session"]
+
+
+@pytest.mark.anyio
+async def test_dependency_not_cached():
+    counter = iter(range(10))
+
+    def get_number():
+        return next(counter)
+
+    async def handler(
+        a=Depends(get_number, use_cache=False), b=Depends(get_number, use_cache=False)
+    ):
+        return HTTPResponse(f"{a} {b}")
+
+    app = Arc(routes=[Route("/", handler)])
+
+    assert (await request(app, "/")).text == "0 1"
+
+
+@pytest.mark.anyio
+async def test_independent_dependencies_run_concurrently():
+    running = []
+
+    async def first():
+        running.append("first")
+        await asyncio.sleep(0)
+        return len(running)
+
+    async def second():
+        running.append("second")
+        await asyncio.sleep(0)
+        return len(running)
+
+    async def handler(a=Depends(first), b=Depends(second)):
+        return HTTPResponse(f"{a} {b}")
+
+    app = Arc(routes=[Route("/", handler)])
+
+    # Both dependencies started before either one finished
+    assert (await request(app, "/")).text == "2 2"
+
+
+@pytest.mark.anyio
+async def test_app_scoped_dependency_cached_across_requests():
+    calls = []
+
+    async def get_client(state: State):
+        calls.append("client")
+        return state.base_url
+
+    async def handler(client: str = Depends(get_client, scope="app")):
+        return HTTPResponse(client)
+
+    app = Arc(routes=[Route("/", handler)])
+    app.state.base_url = "http://example.com"
+
+    assert (await request(app, "/")).text == "http://example.com"
+    assert (await request(app, "/")).text == "http://example.com"
+    assert calls == ["client"]
+
+
+@pytest.mark.anyio
+async def test_app_scoped_dependency_called_once_concurrently():
+    calls = []
+
+    async def get_pool():
+        calls.append("pool")
+        await asyncio.sleep(0.01)
+        return object()
+
+    async def handler(pool=Depends(get_pool, scope="app")):
+        return HTTPResponse(f"{id(pool)}")
+
+    app = Arc(routes=[Route("/", handler)])
+
+    async with AsyncClient(app=app, base_url="http://127.0.0.1:5000/") as ac:
+        responses = await asyncio.gather(*(ac.get("/") for _ in range(5)))
+
+    assert len({response.text for response in responses}) == 1
+    assert calls == ["pool"]
+
+
+@pytest.mark.anyio
+async def test_failed_app_scoped_dependency_retried():
+    calls = []
+
+    async def get_pool():
+        calls.append("pool")
+        if len(calls) == 1:
+            raise ConnectionError("database unavailable")
+        return "pool"
+
+    async def handler(pool=Depends(get_pool, scope="app")):
+        return HTTPResponse(pool)
+
+    app = Arc(routes=[Route("/", handler)])
+
+    with pytest.raises(ConnectionError):
+        await request(app, "/")
+
+    assert (await request(app, "/")).text == "pool"
+    assert calls == ["pool", "pool"]
+
+
+@pytest.mark.anyio
+async def test_app_scoped_dependency_unaffected_by_failing_sibling():
+    calls = []
+
+    async def get_pool():
+        calls.append("pool")
+        await asyncio.sleep(0.01)
+        return "pool"
+
+    async def authenticate(token: str):
+        if token == "bad":
+            raise ValueError("bad token")
+        return token
+
+    async def handler(
+        pool: str = Depends(get_pool, scope="app"), user: str = Depends(authenticate)
+    ):
+        return HTTPResponse(f"{pool} {user}")
+
+    app = Arc(routes=[Route("/", handler)])
+
+    async with AsyncClient(app=app, base_url="http://127.0.0.1:5000/") as ac:
+        bad, good = await asyncio.gather(
+            ac.get("/?token=bad"), ac.get("/?token=good"), return_exceptions=True
+        )
+
+    assert isinstance(bad, ValueError)
+    assert good.text == "pool good"
+    assert calls == ["pool"]
+
+
+@pytest.mark.anyio
+async def test_app_scoped_dependency_survives_cancelled_request():
+    calls = []
+    started = asyncio.Event()
+
+    async def get_pool():
+        calls.append("pool")
+        started.set()
+        await asyncio.sleep(0.01)
+        return "pool"
+
+    async def handler(pool: str = Depends(get_pool, scope="app")):
+        return HTTPResponse(pool)
+
+    app = Arc(routes=[Route("/", handler)])
+
+    async with AsyncClient(app=app, base_url="http://127.0.0.1:5000/") as ac:
+        first = asyncio.ensure_future(ac.get("/"))
+        await started.wait()
+        second = asyncio.ensure_future(ac.get("/"))
+        await asyncio.sleep(0)
+        first.cancel()
+
+        assert (await second).text == "pool"
+
+    assert calls == ["pool"]
+
+
+def test_dependency_graph_levels():
+    async def a(): ...
+
+    async def b(a=Depends(a)): ...
+
+    async def c(): ...
+
+    async def handler(b=Depends(b), c=Depends(c)): ...
+
+    route = Route("/", handler)
+    levels = [
+        sorted(node.call.__name__ for node in level)
+        for level in route.dependencies.levels
+    ]
+
+    assert levels == [["a", "c"], ["b"]]
+
+
+def test_invalid_dependencies():
+    async def get_user(): ...
+
+    async def get_client(user=Depends(get_user)): ...
+
+    async def handler(client=Depends(get_client, scope="app")): ...
+
+    with pytest.raises(AttributeError):
+        Route("/", handler)
+
+    with pytest.raises(AttributeError):
+        Depends(get_user, scope="session")
+
+    async def get_tenant(tenant: str): ...
+
+    async def tenant_handler(tenant=Depends(get_tenant, scope="app")): ...
+
+    with pytest.raises(AttributeError):
+        Route("/", tenant_handler)
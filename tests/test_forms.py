@@ -0,0 +1,191 @@
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+
+from arc import Arc
+from arc.exceptions import BadRequest, PayloadTooLarge
+from arc.http import FormData, Request, UploadFile
+from arc.http.forms import MultiPartParser, parse_urlencoded
+from arc.http.responses import JSONResponse
+from arc.routing import Route
+
+BOUNDARY = b"----arcboundary"
+
+
+def multipart_body(*parts: tuple[str, bytes, str]) -> bytes:
+    """Builds a multipart body from tuples of names, contents and filenames"""
+
+    body = b""
+    for name, content, filename in parts:
+        disposition = f'form-data; name="{name}"'
+        if filename is not None:
+            disposition += f'; filename="{filename}"'
+
+        body += b"--" + BOUNDARY + b"\r\n"
+        body += f"Content-Disposition: {disposition}\r\n".encode()
+        if filename is not None:
+            body += b"Content-Type: text/plain\r\n"
+        body += b"\r\n" + content + b"\r\n"
+
+    return body + b"--" + BOUNDARY + b"--\r\n"
+
+
+def parse(body: bytes, chunk_size: int, **kwargs) -> FormData:
+    parser = MultiPartParser(BOUNDARY, **kwargs)
+    for i in range(0, len(body), chunk_size):
+        parser.feed(body[i : i + chunk_size])
+    return parser.close()
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 64, 1 << 20])
+def test_multipart_parser_chunked(chunk_size: int):
+    content = b"line one\r\nline two\r\n--not-the-boundary\r\n" * 10
+    body = multipart_body(
+        ("title", "café".encode(), None),
+        ("upload", content, "notes.txt"),
+        ("empty", b"", None),
+    )
+
+    form = parse(b"preamble\r\n" + body + b"epilogue", chunk_size)
+
+    assert form["title"] == "café"
+    assert form["empty"] == ""
+
+    upload = form["upload"]
+    assert isinstance(upload, UploadFile)
+    assert upload.filename == "notes.txt"
+    assert upload.content_type == "text/plain"
+    assert upload.size == len(content)
+    assert upload.file.read() == content
+
+
+def test_multipart_parser_spools_large_files():
+    body = multipart_body(
+        ("small", b"x" * 10, "small.bin"), ("large", b"x" * 100, "large.bin")
+    )
+
+    form = parse(body, 16, spool_max_size=50)
+
+    assert form["small"].in_memory
+    assert not form["large"].in_memory
+    assert form["large"].file.read() == b"x" * 100
+
+
+def test_multipart_parser_limits():
+    with pytest.raises(BadRequest):
+        parse(multipart_body(*[("field", b"x", None)] * 3), 64, max_parts=2)
+
+    with pytest.raises(PayloadTooLarge):
+        parse(multipart_body(("field", b"x" * 100, None)), 64, max_field_size=10)
+
+    with pytest.raises(PayloadTooLarge):
+        parse(multipart_body(("file", b"x" * 100, "a.bin")), 64, max_file_size=10)
+
+
+def test_multipart_parser_malformed():
+    with pytest.raises(BadRequest):
+        parse(multipart_body(("field", b"x", None))[:-10], 64)
+
+    with pytest.raises(BadRequest):
+        parse(b"--" + BOUNDARY + b"\r\nContent-Type: text/plain\r\n\r\nx\r\n", 64)
+
+    with pytest.raises(BadRequest):
+        parse(multipart_body(("field", b"\xff", None)), 64)
+
+    body = multipart_body(("field", b"x", None)).replace(
+        b"\r\n\r\n", b"\r\nContent-Type: text/plain; charset=bogus\r\n\r\n"
+    )
+    with pytest.raises(BadRequest):
+        parse(body, 64)
+
+
+def test_urlencoded_malformed():
+    assert parse_urlencoded(b"a=1&b=&c").items() == [("a", "1"), ("b", ""), ("c", "")]
+
+    with pytest.raises(BadRequest):
+        parse_urlencoded(b"a=1&b=2&c=3", max_parts=2)
+
+    with pytest.raises(BadRequest):
+        parse_urlencoded(b"a=%ff")
+
+
+def test_request_form_writes_files_off_the_loop():
+    body = multipart_body(("upload", b"x" * 1000, "a.bin"))
+    chunks = [body[i : i + 100] for i in range(0, len(body), 100)]
+
+    async def receive():
+        chunk = chunks.pop(0)
+        return {"type": "http.request", "body": chunk, "more_body": bool(chunks)}
+
+    scope = {
+        "type": "http",
+        "headers": [
+            (b"content-type", b"multipart/form-data; boundary=" + BOUNDARY),
+        ],
+    }
+
+    async def run() -> tuple[FormData, int]:
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0)
+
+        # receive() never suspends, so the ticker only runs while the
+        # parser writes to disk in the executor
+        ticker = asyncio.ensure_future(tick())
+        await asyncio.sleep(0)
+        started = ticks
+
+        form = await Request(scope, receive, None).form(spool_max_size=200)
+        ticker.cancel()
+        return form, ticks - started
+
+    form, ticks = asyncio.run(run())
+
+    assert form["upload"].size == 1000
+    assert not form["upload"].in_memory
+    assert ticks > 0
+
+
+async def form_handler(request: Request):
+    form = await request.form(max_parts=5, max_field_size=100)
+    data = {
+        key: value.filename if isinstance(value, UploadFile) else value
+        for key, value in form.items()
+    }
+    await form.close()
+    return JSONResponse(data)
+
+
+@pytest.mark.anyio
+async def test_request_form():
+    app = Arc(routes=[Route("/", form_handler, "post")])
+
+    async with AsyncClient(app=app, base_url="http://127.0.0.1:5000/") as ac:
+        response = await ac.post(
+            "/", data={"name": "arc"}, files={"upload": ("a.txt", b"contents")}
+        )
+        assert response.json() == {"name": "arc", "upload": "a.txt"}
+
+        response = await ac.post("/", data={"name": "arc", "version": "1"})
+        assert response.json() == {"name": "arc", "version": "1"}
+
+        response = await ac.post("/", data={str(i): "x" for i in range(10)})
+        assert response.status_code == 400
+
+        response = await ac.post("/", data={"name": "x" * 200})
+        assert response.status_code == 413
+
+        response = await ac.post("/", content=b"{}")
+        assert response.status_code == 400
+
+        response = await ac.post(
+            "/",
+            content=b"name=%ff",
+            headers={"content-type": "application/x-www-form-urlencoded"},
+        )
+        assert response.status_code == 400
@@ -0,0 +1,142 @@
+import pytest
+from httpx import AsyncClient
+
+from arc import Arc
+from arc.http.responses import HTTPResponse
+from arc.routing import Route
+
+
+async def index():
+    return HTTPResponse("index")
+
+
+async def create():
+    return HTTPResponse("created", status_code=201)
+
+
+async def item(item_id: int, verbose: bool = False):
+    return HTTPResponse(f"{item_id + 1} {verbose}")
+
+
+async def name(name: str):
+    return HTTPResponse(name)
+
+
+def create_app() -> Arc:
+    app = Arc(
+        routes=[
+            Route("/", index),
+            Route("/", create, "post"),
+            Route("/items/{item_id}", item),
+            Route("/names/{name}", name),
+        ]
+    )
+    app.freeze()
+    return app
+
+
+@pytest.mark.anyio
+async def test_frozen_dispatch():
+    app = create_app()
+
+    async with AsyncClient(app=app, base_url="http://127.0.0.1:5000/") as ac:
+        assert (await ac.get("/")).text == "index"
+        assert (await ac.post("/")).status_code == 201
+        assert (await ac.get("/items/1?verbose=true")).text == "2 True"
+        assert (await ac.get("/names/arc")).text == "arc"
+        assert (await ac.get("/items/foo")).status_code == 400
+        assert (await ac.get("/missing")).status_code == 404
+
+        response = await ac.delete("/")
+        assert response.status_code == 405
+        assert response.headers["allow"] == "GET, POST"
+
+
+def test_frozen_table():
+    app = create_app()
+    table = app.router.table
+
+    assert set(table.static) == {"/"}
+    assert len(table.dynamic) == 2
+
+    plan, path_params, _ = table.match("GET", "/items/10")
+    assert path_params == {"item_id": "10"}
+    assert set(plan.coercers) == {"item_id", "verbose"}
+
+    # Parameters declared as str aren't cast
+    plan, _, _ = table.match("GET", "/names/arc")
+    assert not plan.coercers
+
+    assert table.match("PUT", "/items/10") == (None, {}, "GET")
+    assert table.match("GET", "/missing") == (None, {}, None)
+
+
+def handler(name: str):
+    async def handler(*args, **kwargs):
+        return HTTPResponse(name)
+
+    return handler
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize(
+    "routes",
+    [
+        [
+            Route("/a/{x}", handler("get x")),
+            Route("/a/{y}", handler("post y"), "post"),
+        ],
+        [
+            Route("/u/{user_id}", handler("user")),
+            Route("/u/me", handler("me")),
+            Route("/u/me", handler("delete me"), "delete"),
+        ],
+        [
+            Route("/u/me", handler("me")),
+            Route("/u/{user_id}", handler("user")),
+            Route("/u/{user_id}", handler("post user"), "post"),
+        ],
+    ],
+)
+async def test_frozen_dispatch_matches_unfrozen(routes: list[Route]):
+    requests = [
+        (method, path)
+        for method in ("GET", "POST", "DELETE", "PUT")
+        for path in ("/a/1", "/u/me", "/u/1", "/missing")
+    ]
+
+    async def responses(app: Arc) -> list[tuple[int, str, str]]:
+        async with AsyncClient(app=app, base_url="http://127.0.0.1:5000/") as ac:
+            results = []
+            for method, path in requests:
+                response = await ac.request(method, path)
+                results.append(
+                    (
+                        response.status_code,
+                        response.text,
+                        response.headers.get("allow"),
+                    )
+                )
+            return results
+
+    app = Arc(routes=routes)
+    unfrozen = await responses(app)
+    app.freeze()
+
+    assert await responses(app) == unfrozen
+
+
+def test_mutation_after_freeze():
+    app = create_app()
+
+    with pytest.raises(AttributeError):
+        app.router.register("/new", index, "get")
+
+    with pytest.raises(TypeError):
+        app.router.routes["get_/new"] = Route("/new", index)
+
+    with pytest.raises(AttributeError):
+        app.on_startup(index)
+
+    with pytest.raises(TypeError):
+        app.router.table.static["/"].plans["put"] = None
@@ -0,0 +1,94 @@
+import subprocess
+import sys
+
+# The maximum total time, in microseconds, that importing arc may take
+IMPORT_TIME_BUDGET = 100_000
+
+HEAVY_MODULES = ("pydantic", "uvicorn", "orjson")
+
+
+def import_times(code: str) -> dict[str, int]:
+    """Runs code in a new interpreter with `-X importtime`
+
+    Returns:
+        A dict of the top level modules imported by the code and their
+        cumulative import times in microseconds.
+    """
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+
+        _, cumulative, name = line.split("|")
+        if not name.startswith("  "):  # Modules imported at the top level
+            times[name.strip()] = int(cumulative)
+
+    return times
+
+
+def imported_modules(code: str) -> set[str]:
+    result = subprocess.run(
+        [sys.executable, "-c", f"{code}\nimport sys\nprint(*sys.modules)"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return set(result.stdout.split())
+
+
+def test_import_time_budget():
+    times = import_times("from arc import Arc")
+    arc_time = sum(time for name, time in times.items() if name.startswith("arc"))
+
+    assert arc_time < IMPORT_TIME_BUDGET
+    # Heavy modules would be imported by arc, so they'd be nested in `times`
+    assert not imported_modules("from arc import Arc") & set(HEAVY_MODULES)
+
+
+def test_untyped_app_does_not_import_heavy_modules():
+    modules = imported_modules(
+        "\n".join(
+            [
+                "import asyncio",
+                "from arc import Arc",
+                "from arc.http import HTTPResponse",
+                "async def handler(): return HTTPResponse('Hello')",
+                "app = Arc()",
+                "app.router.register('/', handler, 'get')",
+                "async def send(message): pass",
+                "scope = {'type': 'http', 'method': 'GET', 'path': '/', 'query_string': b''}",
+                "asyncio.run(app(scope, None, send))",
+            ]
+        )
+    )
+
+    assert not modules & set(HEAVY_MODULES)
+
+
+def test_typed_route_imports_pydantic():
+    modules = imported_modules(
+        "\n".join(
+            [
+                "import asyncio",
+                "from arc import Arc",
+                "from arc.http import HTTPResponse",
+                "async def handler(bar: int): return HTTPResponse(str(bar))",
+                "app = Arc()",
+                "app.router.register('/{bar}', handler, 'get')",
+                "async def send(message): pass",
+                "scope = {'type': 'http', 'method': 'GET', 'path': '/1', 'query_string': b''}",
+                "asyncio.run(app(scope, None, send))",
+            ]
+        )
+    )
+
+    assert "pydantic" in modules
+    assert "uvicorn" not in modules
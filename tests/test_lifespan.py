@@ -0,0 +1,184 @@
+from contextlib import asynccontextmanager
+
+import anyio
+import pytest
+from httpx import AsyncClient
+
+from arc import Arc, State
+from arc.http.responses import HTTPResponse
+from arc.routing import Route
+
+
+class FakePool:
+    """A stand-in for a connection pool, which counts its connections"""
+
+    created = 0
+
+    def __init__(self):
+        FakePool.created += 1
+        self.open = True
+        self.acquired = 0
+
+    async def acquire(self) -> int:
+        self.acquired += 1
+        return self.acquired
+
+    async def close(self):
+        self.open = False
+
+
+async def run_lifespan(app: Arc, messages: list[str]) -> list[dict]:
+    """Drives the ASGI lifespan protocol with the given message types"""
+
+    incoming = [{"type": message} for message in messages]
+    sent = []
+
+    async def receive():
+        return incoming.pop(0)
+
+    async def send(message: dict):
+        sent.append(message)
+
+    await app({"type": "lifespan"}, receive, send)
+    return sent
+
+
+@asynccontextmanager
+async def running(app: Arc):
+    """Runs the application's lifespan in the background"""
+
+    started, stopping = anyio.Event(), anyio.Event()
+
+    async def receive():
+        if not started.is_set():
+            return {"type": "lifespan.startup"}
+
+        await stopping.wait()
+        return {"type": "lifespan.shutdown"}
+
+    async def send(message: dict):
+        if message["type"] == "lifespan.startup.complete":
+            started.set()
+
+    async with anyio.create_task_group() as tg:
+        tg.start_soon(app, {"type": "lifespan"}, receive, send)
+        await started.wait()
+        yield
+        stopping.set()
+
+
+@pytest.fixture(autouse=True)
+def reset_pool():
+    FakePool.created = 0
+
+
+@pytest.mark.anyio
+async def test_startup_and_shutdown_hooks():
+    calls = []
+    app = Arc(on_startup=[lambda: calls.append("sync startup")])
+
+    @app.on_startup
+    async def startup():
+        calls.append("async startup")
+
+    @app.on_shutdown
+    async def shutdown():
+        calls.append("shutdown")
+
+    sent = await run_lifespan(app, ["lifespan.startup", "lifespan.shutdown"])
+
+    assert calls == ["sync startup", "async startup", "shutdown"]
+    assert [message["type"] for message in sent] == [
+        "lifespan.startup.complete",
+        "lifespan.shutdown.complete",
+    ]
+
+
+@pytest.mark.anyio
+async def test_startup_failure():
+    async def startup():
+        raise RuntimeError("pool unavailable")
+
+    app = Arc(on_startup=[startup])
+    sent = []
+
+    async def receive():
+        return {"type": "lifespan.startup"}
+
+    async def send(message: dict):
+        sent.append(message)
+
+    with pytest.raises(RuntimeError):
+        await app({"type": "lifespan"}, receive, send)
+
+    assert sent == [
+        {
+            "type": "lifespan.startup.failed",
+            "message": "RuntimeError('pool unavailable')",
+        }
+    ]
+
+
+@pytest.mark.anyio
+async def test_lifespan_pool_shared_across_requests():
+    @asynccontextmanager
+    async def lifespan(app: Arc):
+        pool = FakePool()
+        yield {"pool": pool}
+        await pool.close()
+
+    async def handler(state: State):
+        return HTTPResponse(f"{await state.pool.acquire()}")
+
+    app = Arc(routes=[Route("/", handler)], lifespan=lifespan)
+
+    async with running(app):
+        pool = app.state.pool
+
+        async with AsyncClient(app=app, base_url="http://127.0.0.1:5000/") as ac:
+            responses = [await ac.get("/") for _ in range(3)]
+
+        assert pool.open
+
+    assert [response.text for response in responses] == ["1", "2", "3"]
+    assert FakePool.created == 1
+    assert not pool.open
+
+
+@pytest.mark.anyio
+async def test_lifespan_yielding_a_non_mapping():
+    @asynccontextmanager
+    async def lifespan(app: Arc):
+        pool = FakePool()
+        yield pool
+        await pool.close()
+
+    app = Arc(lifespan=lifespan)
+    sent = await run_lifespan(app, ["lifespan.startup", "lifespan.shutdown"])
+
+    assert [message["type"] for message in sent] == [
+        "lifespan.startup.complete",
+        "lifespan.shutdown.complete",
+    ]
+    assert list(app.state) == []
+
+
+@pytest.mark.anyio
+async def test_unexpected_lifespan_message():
+    app = Arc()
+
+    with pytest.raises(RuntimeError):
+        await run_lifespan(app, ["lifespan.startup", "http.request"])
+
+
+def test_state():
+    state = State({"pool": 1})
+    state.client = 2
+
+    assert state.pool == 1
+    assert "client" in state
+    assert list(state) == ["pool", "client"]
+
+    del state.client
+    with pytest.raises(AttributeError):
+        state.client
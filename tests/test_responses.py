@@ -0,0 +1,97 @@
+import hashlib
+
+import pytest
+
+from arc import Arc
+from arc.http import Request
+from arc.http.responses import HTTPResponse
+from arc.routing import Route
+from arc.testing import ASGIDriver
+
+EXTENSIONS = {"http.response.early_hint": {}, "http.response.trailers": {}}
+
+
+async def page(request: Request):
+    await request.send_early_hints(["</app.js>; rel=preload; as=script"])
+    return HTTPResponse("<h1>Page</h1>")
+
+
+async def download():
+    body = b"contents"
+    return HTTPResponse(
+        body, trailers={"Digest": f"sha-256={hashlib.sha256(body).hexdigest()}"}
+    )
+
+
+def create_app() -> Arc:
+    return Arc(
+        routes=[
+            Route("/page", page, early_hints=["</style.css>; rel=preload; as=style"]),
+            Route("/download", download),
+        ]
+    )
+
+
+@pytest.mark.anyio
+async def test_early_hints():
+    response = await ASGIDriver(create_app(), EXTENSIONS).get("/page")
+
+    hints = [message["links"] for message in response.messages[:2]]
+    assert [message["type"] for message in response.messages[:2]] == [
+        "http.response.early_hint"
+    ] * 2
+    assert hints == [
+        [b"</style.css>; rel=preload; as=style"],
+        [b"</app.js>; rel=preload; as=script"],
+    ]
+    assert response.status_code == 200
+
+
+@pytest.mark.anyio
+async def test_early_hints_decorator():
+    app = Arc()
+
+    @app.route("/", "get", early_hints=["</style.css>; rel=preload; as=style"])
+    async def index():
+        return HTTPResponse("index")
+
+    response = await ASGIDriver(app, EXTENSIONS).get("/")
+
+    assert response.messages[0] == {
+        "type": "http.response.early_hint",
+        "links": [b"</style.css>; rel=preload; as=style"],
+    }
+    assert response.text == "index"
+
+
+@pytest.mark.anyio
+async def test_trailers():
+    response = await ASGIDriver(create_app(), EXTENSIONS).get("/download")
+    start, body, trailers = response.messages
+
+    assert start["trailers"] is True
+    assert (b"trailer", b"digest") in start["headers"]
+    assert body["body"] == b"contents"
+    assert trailers == {
+        "type": "http.response.trailers",
+        "headers": [
+            (b"digest", f"sha-256={hashlib.sha256(b'contents').hexdigest()}".encode())
+        ],
+        "more_trailers": False,
+    }
+
+
+@pytest.mark.anyio
+async def test_extensions_not_advertised():
+    driver = ASGIDriver(create_app())
+
+    response = await driver.get("/page")
+    assert [message["type"] for message in response.messages] == [
+        "http.response.start",
+        "http.response.body",
+    ]
+
+    response = await driver.get("/download")
+    assert len(response.messages) == 2
+    assert "trailers" not in response.messages[0]
+    assert response.body == b"contents"
@@ -0,0 +1,112 @@
+import collections
+import pstats
+import time
+
+import pytest
+
+from arc import Arc
+from arc.http import Request
+from arc.http.responses import HTTPResponse, JSONResponse
+from arc.routing import Route
+from arc.testing import (
+    ASGIDriver,
+    LoadReport,
+    SamplingProfiler,
+    TraceRequest,
+    load_trace,
+    replay,
+)
+
+
+@pytest.fixture
+def anyio_backend():
+    # The load generator schedules requests with asyncio
+    return "asyncio"
+
+
+async def index():
+    return HTTPResponse("index")
+
+
+async def echo(request: Request, name: str = "arc"):
+    return JSONResponse({"name": name, "body": (await request.body()).decode()})
+
+
+@pytest.fixture
+def app() -> Arc:
+    return Arc(routes=[Route("/", index), Route("/echo", echo, "post")])
+
+
+@pytest.mark.anyio
+async def test_driver(app: Arc):
+    driver = ASGIDriver(app)
+
+    response = await driver.get("/")
+    assert response.status_code == 200
+    assert response.text == "index"
+
+    response = await driver.post("/echo", query_string="name=caf%C3%A9", body=b"hi")
+    assert response.json() == {"name": "café", "body": "hi"}
+    assert (b"content-type", b"application/json") in response.headers
+
+    response = await driver.get("/missing")
+    assert response.status_code == 404
+
+
+@pytest.mark.anyio
+async def test_replay_trace(app: Arc, tmp_path):
+    trace_path = tmp_path / "trace.jsonl"
+    trace_path.write_text(
+        '{"method": "GET", "path": "/"}\n'
+        "\n"
+        '{"method": "post", "path": "/echo", "query_string": "name=x", "body": "b"}\n'
+        '{"path": "/missing"}\n'
+    )
+
+    trace = load_trace(str(trace_path))
+    assert [request.method for request in trace] == ["GET", "POST", "GET"]
+
+    report = await replay(app, trace, rate=1000, repeat=5)
+
+    assert report.statuses == {200: 10, 404: 5}
+    assert report.errors == 0
+    assert len(report.latencies) == 15
+    assert report.percentile(50) <= report.percentile(99) <= report.latencies[-1]
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("profiler", ["cprofile", "sampling"])
+async def test_replay_profiled(app: Arc, profiler: str):
+    trace = [TraceRequest(path="/")] * 50
+
+    report = await replay(app, trace, profiler=profiler)
+
+    if profiler == "cprofile":
+        assert isinstance(report.profile, pstats.Stats)
+    else:
+        assert isinstance(report.profile, SamplingProfiler)
+
+
+def test_sampling_profiler():
+    profiler = SamplingProfiler(interval=0.001)
+    profiler.start()
+
+    end = time.perf_counter() + 0.05
+    while time.perf_counter() < end:
+        pass  # Keep the thread busy, so there's something to sample
+
+    profiler.stop()
+
+    assert profiler.samples
+    assert "test_sampling_profiler" in profiler.collapsed()
+
+
+def test_percentiles():
+    report = LoadReport(
+        [i / 100 for i in range(100, 0, -1)], collections.Counter(), 0, 1
+    )
+
+    assert report.percentile(50) == 0.5
+    assert report.percentile(99) == 0.99
+    assert report.percentile(100) == 1.0
+    assert report.throughput == 100